@@ -0,0 +1,110 @@
+import fcntl
+import hashlib
+import io
+import json
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from docx import Document
+from PIL import Image
+
+# One manifest per output directory, keyed by artifact file name
+MANIFEST_NAME = "build_manifest.json"
+LOCK_NAME = ".build_manifest.lock"
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def content_hash(data: bytes) -> str:
+	return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest(directory: str) -> dict:
+	path = os.path.join(directory, MANIFEST_NAME)
+	if not os.path.exists(path):
+		return {}
+	with open(path, encoding="utf-8") as f:
+		return json.load(f)
+
+
+def replace_file(path: str, data: bytes) -> None:
+	# Readers never see a partial file: write beside the target, then rename
+	tmp = f"{path}.{os.getpid()}.tmp"
+	with open(tmp, "wb") as f:
+		f.write(data)
+	os.replace(tmp, path)
+
+
+@contextmanager
+def manifest_lock(directory: str) -> Iterator[None]:
+	with open(os.path.join(directory, LOCK_NAME), "a") as lock:
+		fcntl.flock(lock, fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_artifacts(directory: str, artifacts: Dict[str, bytes]) -> List[str]:
+	"""Write each ``name -> data`` unless the manifest already records the same hash.
+
+	The file must also still exist, so deleting an artifact forces a rewrite.
+	The manifest is read, updated and replaced once, under a lock on a
+	sidecar file, so concurrent builders in the same directory neither see a
+	half-written manifest nor lose each other's entries. Returns the names
+	that were written.
+	"""
+	written = []
+	with manifest_lock(directory):
+		manifest = load_manifest(directory)
+		for name, data in artifacts.items():
+			digest = content_hash(data)
+			path = os.path.join(directory, name)
+			if manifest.get(name) == digest and os.path.exists(path):
+				continue
+			replace_file(path, data)
+			manifest[name] = digest
+			written.append(name)
+		if written:
+			replace_file(os.path.join(directory, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+	return written
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+	"""Write one artifact; returns True when the file was written."""
+	directory, name = os.path.split(path)
+	return bool(write_artifacts(directory or ".", {name: data}))
+
+
+def deterministic_zip(data: bytes) -> bytes:
+	# Re-pack with fixed timestamps and attributes, keeping python-docx's part
+	# order ([Content_Types].xml first), so equal parts give equal bytes.
+	out = io.BytesIO()
+	with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+		for info in src.infolist():
+			fixed = zipfile.ZipInfo(info.filename, date_time=ZIP_EPOCH)
+			fixed.compress_type = zipfile.ZIP_DEFLATED
+			fixed.external_attr = 0o644 << 16
+			dst.writestr(fixed, src.read(info.filename))
+	return out.getvalue()
+
+
+def document_bytes(doc: Document) -> bytes:
+	buf = io.BytesIO()
+	doc.save(buf)
+	return deterministic_zip(buf.getvalue())
+
+
+def png_bytes(img: Image.Image) -> bytes:
+	buf = io.BytesIO()
+	img.save(buf, format="PNG")
+	return buf.getvalue()
+
+
+def save_document(doc: Document, path: str) -> bool:
+	return write_if_changed(path, document_bytes(doc))
+
+
+def save_png(img: Image.Image, path: str) -> bool:
+	return write_if_changed(path, png_bytes(img))
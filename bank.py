@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import sys
+import uuid
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from bank_coverage import Coverage, build_coverage
+
+# Fixed-width columns; everything else in a record lives in the text heap
+TAXONOMY = ("subject", "unit", "topic")
+DIFFICULTIES = ("easy", "moderate", "hard")
+COLUMNS = {
+	"order": np.int32,
+	"subject": np.uint16,
+	"unit": np.uint16,
+	"topic": np.uint16,
+	"difficulty": np.uint8,
+}
+# Calibrated difficulties, keyed by record_key, re-applied on every export
+OVERRIDES_NAME = "difficulty_overrides.json"
+
+# User-set block keys -> bank (Set A) keys
+USER_KEYS = {
+	"title": "title",
+	"desc": "desc",
+	"question": "q",
+	"instruction": "instr",
+	"difficulty": "difficulty",
+	"order": "order",
+	"options": "opts",
+	"answer": "ans",
+	"explanation": "exp",
+	"subject": "subject",
+	"unit": "unit",
+	"topic": "topic",
+	"image": "image",
+}
+
+
+def normalize_block(block: dict) -> dict:
+	# Accepts either schema; Set A items pass through unchanged
+	return {USER_KEYS.get(k, k): v for k, v in block.items()}
+
+
+def record_key(item: dict) -> str:
+	# Identity that survives re-export: row numbers do not
+	ident = json.dumps([item.get("source", ""), item["order"], item["q"]], ensure_ascii=False)
+	return hashlib.blake2b(ident.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def load_overrides(path: str) -> dict:
+	overrides_path = os.path.join(path, OVERRIDES_NAME)
+	if not os.path.exists(overrides_path):
+		return {}
+	with open(overrides_path, encoding="utf-8") as f:
+		return json.load(f)
+
+
+def encode_rows(questions: Iterable[dict], path: str, labels: dict, columns: dict, offsets: list, heap, coverage: Coverage) -> None:
+	# Shared by export_bank and append_bank: codes each record into ``columns``
+	# (extending ``labels``), writes its text blob to ``heap`` and counts it
+	overrides = load_overrides(path)
+	codes = {name: {label: i for i, label in enumerate(labels[name])} for name in TAXONOMY}
+	for raw in questions:
+		item = normalize_block(raw)
+		if overrides:
+			item["difficulty"] = overrides.get(record_key(item), item["difficulty"])
+		if item["difficulty"] not in DIFFICULTIES:
+			raise ValueError(f"unknown difficulty {item['difficulty']!r} for @Order {item['order']}")
+		coverage.apply_insert(item)
+		columns["order"].append(item["order"])
+		columns["difficulty"].append(DIFFICULTIES.index(item["difficulty"]))
+		for name in TAXONOMY:
+			label = item[name]
+			if label not in codes[name]:
+				codes[name][label] = len(labels[name])
+				labels[name].append(label)
+			columns[name].append(codes[name][label])
+		rest = {k: v for k, v in item.items() if k not in COLUMNS}
+		blob = json.dumps(rest, ensure_ascii=False).encode("utf-8")
+		heap.write(blob)
+		offsets.append(offsets[-1] + len(blob))
+
+
+def save_array(path: str, array: np.ndarray) -> None:
+	tmp = path + ".tmp.npy"
+	np.save(tmp, array)
+	os.replace(tmp, path)
+
+
+def write_meta(path: str, meta: dict) -> None:
+	tmp = os.path.join(path, "meta.json.tmp")
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump(meta, f, ensure_ascii=False, indent=1)
+	os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def export_bank(questions: Iterable[dict], path: str) -> int:
+	"""Write questions to ``path`` as a columnar bank and return the row count.
+
+	Taxonomy fields and difficulty become small integer codes in ``.npy``
+	columns (labels are kept in ``meta.json``); the remaining fields of each
+	record are stored as one UTF-8 JSON blob in ``text_heap.bin``, addressed by
+	``text_offsets.npy``. Difficulties calibrated with ``set_difficulty`` are
+	kept in ``difficulty_overrides.json`` and win over the incoming records.
+	"""
+	os.makedirs(path, exist_ok=True)
+	labels = {name: [] for name in TAXONOMY}
+	columns = {name: [] for name in COLUMNS}
+	offsets = [0]
+	coverage = Coverage()
+	with open(os.path.join(path, "text_heap.bin"), "wb") as heap:
+		encode_rows(questions, path, labels, columns, offsets, heap, coverage)
+	for name, dtype in COLUMNS.items():
+		save_array(os.path.join(path, f"{name}.npy"), np.asarray(columns[name], dtype=dtype))
+	save_array(os.path.join(path, "text_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+	labels["difficulty"] = list(DIFFICULTIES)
+	# A fresh generation id tells derived data (the search index) that row ids
+	# from an earlier export no longer apply
+	meta = {"count": len(offsets) - 1, "labels": labels, "generation": uuid.uuid4().hex}
+	write_meta(path, meta)
+	coverage.save(path)
+	return meta["count"]
+
+
+def append_bank(questions: Iterable[dict], path: str) -> int:
+	"""Append questions as new rows of the bank at ``path``; returns the new row count.
+
+	Existing rows keep their ids and the export generation is unchanged, so
+	the search index and the coverage counters only take in the new rows.
+	Exports a fresh bank when ``path`` holds none yet.
+	"""
+	if not os.path.exists(os.path.join(path, "meta.json")):
+		return export_bank(questions, path)
+	bank = Bank(path)
+	coverage = Coverage.load(path)
+	if coverage.rows != len(bank):
+		coverage = build_coverage(bank.records())
+	labels = {name: list(bank.meta["labels"][name]) for name in TAXONOMY}
+	columns = {name: [] for name in COLUMNS}
+	offsets = [int(bank.offsets[-1])]
+	with open(os.path.join(path, "text_heap.bin"), "r+b") as heap:
+		# Drop any tail left by an append that died before meta.json was updated
+		heap.truncate(offsets[0])
+		heap.seek(offsets[0])
+		encode_rows(questions, path, labels, columns, offsets, heap, coverage)
+	added = len(offsets) - 1
+	if added:
+		for name, dtype in COLUMNS.items():
+			old = np.asarray(bank.columns[name][:len(bank)])
+			save_array(os.path.join(path, f"{name}.npy"), np.concatenate([old, np.asarray(columns[name], dtype=dtype)]))
+		old = np.asarray(bank.offsets[:len(bank) + 1])
+		save_array(os.path.join(path, "text_offsets.npy"), np.concatenate([old, np.asarray(offsets[1:], dtype=np.int64)]))
+		labels["difficulty"] = list(DIFFICULTIES)
+		write_meta(path, dict(bank.meta, count=len(bank) + added, labels=labels))
+		coverage.save(path)
+	return len(bank) + added
+
+
+class Bank:
+	"""Read-only view of an exported bank with memory-mapped columns."""
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+			self.meta = json.load(f)
+		self.columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+		self.offsets = np.load(os.path.join(path, "text_offsets.npy"), mmap_mode="r")
+		heap_path = os.path.join(path, "text_heap.bin")
+		self.heap = np.memmap(heap_path, dtype=np.uint8, mode="r") if os.path.getsize(heap_path) else np.zeros(0, np.uint8)
+
+	def __len__(self) -> int:
+		return self.meta["count"]
+
+	@property
+	def generation(self) -> str:
+		return self.meta.get("generation", "")
+
+	def code(self, field: str, label: str) -> int:
+		table = self.meta["labels"][field]
+		return table.index(label) if label in table else -1
+
+	def mask(self, **where: str) -> np.ndarray:
+		# where: subject/unit/topic/difficulty -> label; an unknown label matches nothing
+		keep = np.ones(len(self), dtype=bool)
+		for field, label in where.items():
+			if label is None:
+				continue
+			if field not in COLUMNS or field == "order":
+				raise KeyError(f"cannot filter on {field!r}")
+			keep &= self.columns[field] == self.code(field, label)
+		return keep
+
+	def filter(self, **where: str) -> np.ndarray:
+		return np.flatnonzero(self.mask(**where))
+
+	def record(self, index: int) -> dict:
+		start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+		item = json.loads(self.heap[start:end].tobytes().decode("utf-8"))
+		item["order"] = int(self.columns["order"][index])
+		for name in TAXONOMY + ("difficulty",):
+			item[name] = self.meta["labels"][name][self.columns[name][index]]
+		return item
+
+	def records(self, indices: Optional[Iterable[int]] = None) -> Iterator[dict]:
+		for i in range(len(self)) if indices is None else indices:
+			yield self.record(int(i))
+
+
+def set_difficulty(path: str, indices: np.ndarray, labels: Iterable[str]) -> None:
+	# Difficulty is fixed-width, so it can be rewritten in place without
+	# touching the heap or the other columns. The new labels are also recorded
+	# as overrides so a later export_bank of the source records keeps them.
+	indices = np.asarray(indices)
+	codes = np.asarray([DIFFICULTIES.index(label) for label in labels], dtype=COLUMNS["difficulty"])
+	bank, coverage = Bank(path), Coverage.load(path)
+	if coverage.rows != len(bank):
+		# Bank exported before coverage counters existed
+		coverage = build_coverage(bank.records())
+	overrides = load_overrides(path)
+	for i, code in dict(zip(indices.tolist(), codes.tolist())).items():
+		old = bank.record(i)
+		coverage.apply_edit(old, dict(old, difficulty=DIFFICULTIES[code]))
+		overrides[record_key(old)] = DIFFICULTIES[code]
+	column = np.load(os.path.join(path, "difficulty.npy"), mmap_mode="r+")
+	column[indices] = codes
+	column.flush()
+	coverage.save(path)
+	with open(os.path.join(path, OVERRIDES_NAME), "w", encoding="utf-8") as f:
+		json.dump(overrides, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+if __name__ == "__main__":
+	# usage: python bank.py export <dir>
+	#        python bank.py filter <dir> [unit=...] [topic=...] [difficulty=...]
+	command, path = sys.argv[1], sys.argv[2]
+	if command == "export":
+		from generate_shadow_doc import build_questions
+		from generate_shadow_doc_from_user import build_content_blocks
+		print(export_bank(list(build_questions()) + build_content_blocks(), path))
+	elif command == "filter":
+		bank = Bank(path)
+		where = dict(arg.split("=", 1) for arg in sys.argv[3:])
+		for i in bank.filter(**where):
+			item = bank.record(i)
+			print(item["order"], item["difficulty"], item["q"])
+	else:
+		raise SystemExit(f"unknown command {command!r}")
@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+from collections import Counter
+from itertools import product
+from typing import Dict, Iterable, List, Optional
+
+COVERAGE_NAME = "coverage.json"
+DIMENSIONS = ("subject", "unit", "topic", "difficulty")
+ANY = "*"
+
+
+def rollup_keys(rec: dict) -> List[str]:
+	# Every combination of concrete label / ANY over the four dimensions, so a
+	# query on any subset of them is a single dict lookup
+	labels = [(rec[d], ANY) for d in DIMENSIONS]
+	return ["\t".join(combo) for combo in product(*labels)]
+
+
+def figure_of(rec: dict) -> str:
+	return rec.get("figure") or rec.get("image") or ""
+
+
+class Coverage:
+	"""Materialized coverage counters for a bank.
+
+	``cells`` maps a subject/unit/topic/difficulty key (``*`` for "any") to
+	``[items, items_with_figure, total_options]``; ``figures`` counts the
+	questions using each figure and ``options`` is a histogram of option
+	counts. Inserts, deletes and edits touch a fixed number of counters, and
+	every query is a lookup.
+	"""
+
+	def __init__(self, state: Optional[dict] = None) -> None:
+		state = state or {}
+		self.rows = state.get("rows", 0)
+		self.cells: Dict[str, List[int]] = state.get("cells", {})
+		self.figures = Counter(state.get("figures", {}))
+		self.options = Counter({int(k): v for k, v in state.get("options", {}).items()})
+
+	@classmethod
+	def load(cls, bank_dir: str) -> "Coverage":
+		path = os.path.join(bank_dir, COVERAGE_NAME)
+		if not os.path.exists(path):
+			return cls()
+		with open(path, encoding="utf-8") as f:
+			return cls(json.load(f))
+
+	def save(self, bank_dir: str) -> None:
+		state = {"rows": self.rows, "cells": self.cells, "figures": dict(self.figures),
+			"options": {str(k): v for k, v in sorted(self.options.items())}}
+		tmp = os.path.join(bank_dir, COVERAGE_NAME + ".tmp")
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(state, f, ensure_ascii=False)
+		os.replace(tmp, os.path.join(bank_dir, COVERAGE_NAME))
+
+	def apply(self, rec: dict, sign: int) -> None:
+		figure = figure_of(rec)
+		n_opts = len(rec.get("opts", []))
+		for key in rollup_keys(rec):
+			cell = self.cells.setdefault(key, [0, 0, 0])
+			cell[0] += sign
+			cell[1] += sign * bool(figure)
+			cell[2] += sign * n_opts
+			if not cell[0]:
+				del self.cells[key]
+		if figure:
+			self.figures[figure] += sign
+			if not self.figures[figure]:
+				del self.figures[figure]
+		self.options[n_opts] += sign
+		if not self.options[n_opts]:
+			del self.options[n_opts]
+
+	def apply_insert(self, rec: dict) -> None:
+		self.apply(rec, 1)
+		self.rows += 1
+
+	def apply_delete(self, rec: dict) -> None:
+		self.apply(rec, -1)
+		self.rows -= 1
+
+	def apply_edit(self, old: dict, new: dict) -> None:
+		self.apply(old, -1)
+		self.apply(new, 1)
+
+	def cell(self, **where: str) -> Dict[str, float]:
+		unknown = set(where) - set(DIMENSIONS)
+		if unknown:
+			raise KeyError(f"cannot group on {sorted(unknown)}")
+		key = "\t".join(where.get(d) or ANY for d in DIMENSIONS)
+		items, with_figure, options = self.cells.get(key, (0, 0, 0))
+		return {"items": items, "with_figure": with_figure, "mean_options": options / items if items else 0.0}
+
+	def count(self, **where: str) -> int:
+		return self.cell(**where)["items"]
+
+	def breakdown(self, field: str, **where: str) -> Dict[str, int]:
+		# Children of a cell along one dimension; scans the cell table, not the bank
+		i = DIMENSIONS.index(field)
+		fixed = [where.get(d) or ANY for d in DIMENSIONS]
+		out = {}
+		for key, (items, _, _) in self.cells.items():
+			parts = key.split("\t")
+			if parts[i] != ANY and all(parts[j] == fixed[j] for j in range(len(DIMENSIONS)) if j != i):
+				out[parts[i]] = items
+		return out
+
+
+def build_coverage(records: Iterable[dict]) -> Coverage:
+	coverage = Coverage()
+	for rec in records:
+		coverage.apply_insert(rec)
+	return coverage
+
+
+if __name__ == "__main__":
+	# usage: python bank_coverage.py <bank_dir> [field] [unit=...] [topic=...] [difficulty=...]
+	coverage = Coverage.load(sys.argv[1])
+	args = sys.argv[2:]
+	field = args.pop(0) if args and "=" not in args[0] else None
+	where = dict(arg.split("=", 1) for arg in args)
+	print(json.dumps(coverage.cell(**where)))
+	if field:
+		for label, items in sorted(coverage.breakdown(field, **where).items()):
+			print(f"{items:>8}  {label}")
+	print(f"figures in use: {len(coverage.figures)}, option counts: {dict(sorted(coverage.options.items()))}")
@@ -0,0 +1,274 @@
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from artifacts import png_bytes, save_png, write_artifacts
+
+# Figures are drawn as palette indices (one byte per pixel) and encoded as
+# paletted PNGs; PALETTE maps the indices back to the colours the per-figure
+# generators use.
+WHITE, BLACK, BLUE, SHADE = 0, 1, 2, 3
+PALETTE = [255, 255, 255, 0, 0, 0, 0, 0, 255, 185, 185, 185]
+
+
+def canvas(n: int, w: int, h: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+	# Reusing ``out`` across batches avoids page-faulting in a fresh buffer,
+	# which costs more than the drawing itself
+	if out is None:
+		return np.full((n, h, w), WHITE, dtype=np.uint8)
+	out = out[:n]
+	out.fill(WHITE)
+	return out
+
+
+def stroke(imgs: np.ndarray, xs: np.ndarray, ys: np.ndarray, color: int, width: int) -> None:
+	"""Plot sampled points (N x S pixel coordinates) with a square pen, all figures at once."""
+	n, h, w = imgs.shape
+	lo = -(width // 2)
+	x = np.clip(np.rint(xs).astype(np.int32), -lo, w - 1 - (lo + width - 1))
+	y = np.clip(np.rint(ys).astype(np.int32), -lo, h - 1 - (lo + width - 1))
+	base = (np.arange(n, dtype=np.int32)[:, None] * (h * w) + y * w + x).reshape(-1, 1)
+	pen = np.array([dy * w + dx for dy in range(lo, lo + width) for dx in range(lo, lo + width)], dtype=np.int32)
+	# One scatter for every pen pixel of every sample; int32 halves index traffic
+	imgs.reshape(-1)[(base + pen).ravel()] = color
+
+
+def polylines(imgs: np.ndarray, xs: np.ndarray, ys: np.ndarray, color: int, width: int) -> None:
+	"""Draw one polyline per figure through the N x K vertices ``xs``/``ys``."""
+	xs, ys = (np.broadcast_to(np.asarray(v, dtype=np.float64), (imgs.shape[0], np.shape(v)[-1])) for v in (xs, ys))
+	dx, dy = np.diff(xs, axis=1), np.diff(ys, axis=1)
+	steps = int(np.ceil(np.max(np.hypot(dx, dy)))) + 1
+	t = np.linspace(0.0, 1.0, steps)
+	# N x (K-1) x steps samples, flattened so every segment goes in one stroke
+	px = xs[:, :-1, None] + dx[:, :, None] * t
+	py = ys[:, :-1, None] + dy[:, :, None] * t
+	stroke(imgs, px.reshape(len(px), -1), py.reshape(len(py), -1), color, width)
+
+
+# ---------- Line charts (img_altitude / img_altitude_100_to_500) ----------
+
+def line_charts(series: np.ndarray, lo: np.ndarray, hi: np.ndarray, w: int = 520, h: int = 280, left: int = 50, out: Optional[np.ndarray] = None) -> np.ndarray:
+	"""Render N line charts; ``series`` is N x K altitudes at t = 0..K-1, scaled from lo..hi."""
+	n, k = series.shape
+	axes = canvas(1, w, h)
+	polylines(axes, [[left, left, w - 20]], [[20, h - 40, h - 40]], BLACK, 2)
+	imgs = np.empty((n, h, w), dtype=np.uint8) if out is None else out[:n]
+	imgs[:] = axes
+	xs = left + np.arange(k) * (w - 100) // (k - 1)
+	ys = h - 40 - ((series - lo[:, None]) * (h - 80) // (hi - lo)[:, None])
+	polylines(imgs, xs[None, :], ys, BLUE, 3)
+	return imgs
+
+
+# ---------- Shaded grids (img_rect_squares / img_rect_squares_7_12) ----------
+
+def grid_tiles(cell_w: int, cell_h: int) -> np.ndarray:
+	# Cell tile per shading state: 0 blank, 1 right half, 2 full
+	tiles = np.full((3, cell_h, cell_w), WHITE, dtype=np.uint8)
+	tiles[1, 2:cell_h - 1, cell_w // 2:cell_w - 1] = SHADE
+	tiles[2, 2:cell_h - 1, 2:cell_w - 1] = SHADE
+	tiles[:, 2:cell_h - 1, 2:5] = BLACK
+	tiles[:, 2:cell_h - 1, cell_w - 4:cell_w - 1] = BLACK
+	tiles[:, 2:5, 2:cell_w - 1] = BLACK
+	tiles[:, cell_h - 4:cell_h - 1, 2:cell_w - 1] = BLACK
+	return tiles
+
+
+def shaded_grids(shade: np.ndarray, w: int = 390, h: int = 260, out: Optional[np.ndarray] = None) -> np.ndarray:
+	"""Render N rows x cols grids; ``shade`` is N x rows x cols with 1 = full cell,
+	0.5 = right half shaded, 0 = blank.
+
+	Variants of a family share few shading patterns, so each distinct pattern
+	is composed once from three cell tiles and the batch is a single gather
+	of those patterns.
+	"""
+	n, rows, cols = shade.shape
+	cell_w, cell_h = w // cols, h // rows
+	states = np.rint(np.asarray(shade) * 2).astype(np.intp)
+	codes = states.reshape(n, -1) @ (3 ** np.arange(rows * cols))
+	patterns, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+	tiles = grid_tiles(cell_w, cell_h)
+	unique = canvas(len(patterns), w, h)
+	cells = unique[:, :rows * cell_h, :cols * cell_w].reshape(len(patterns), rows, cell_h, cols, cell_w)
+	for r in range(rows):
+		for c in range(cols):
+			cells[:, r, :, c, :] = tiles[states[first, r, c]]
+	imgs = np.empty((n, h, w), dtype=np.uint8) if out is None else out[:n]
+	np.take(unique, inverse.ravel(), axis=0, out=imgs)
+	return imgs
+
+
+# ---------- Shape cycles (img_sequence / img_sequence_5cycle) ----------
+
+SHAPES = ("circle", "square", "triangle", "star", "pentagon")
+
+
+def shape_stamps(size: int) -> np.ndarray:
+	# One palette-index sprite per shape, drawn with PIL once per batch
+	stamps = []
+	r = size // 2 - 2
+	for shape in SHAPES:
+		img = Image.new("L", (size + 1, size + 1), 0)
+		d = ImageDraw.Draw(img)
+		c = size / 2
+		ring = [(c + r * math.cos(-math.pi / 2 + k * 2 * math.pi / 5), c + r * math.sin(-math.pi / 2 + k * 2 * math.pi / 5)) for k in range(5)]
+		if shape == "circle":
+			d.ellipse((0, 0, size, size), outline=255, width=3)
+		elif shape == "square":
+			d.rectangle((0, 0, size, size), outline=255, width=3)
+		elif shape == "triangle":
+			d.polygon([(size / 2, 0), (size, size), (0, size)], outline=255)
+		elif shape == "star":
+			star = [ring[i] for i in [0, 2, 4, 1, 3]]
+			d.line(star + [star[0]], fill=255, width=3)
+		else:
+			d.polygon(ring, outline=255)
+		stamps.append(np.where(np.asarray(img) > 0, BLACK, WHITE).astype(np.uint8))
+	return np.stack(stamps)
+
+
+def shape_cycles(codes: np.ndarray, w: int = 720, h: int = 150, size: int = 50, step: int = 70, left: int = 20, top: int = 25, out: Optional[np.ndarray] = None) -> np.ndarray:
+	"""Render N rows of shapes; ``codes`` is N x slots of indices into SHAPES."""
+	n, slots = codes.shape
+	if left + (slots - 1) * step + size >= w:
+		raise ValueError(f"{slots} shapes need a canvas wider than {left + (slots - 1) * step + size} px (w={w})")
+	stamps = shape_stamps(size)
+	imgs = canvas(n, w, h, out)
+	for i in range(slots):
+		x = left + i * step
+		imgs[:, top:top + size + 1, x:x + size + 1] = stamps[codes[:, i]]
+	return imgs
+
+
+def batches(render: Callable, *params: np.ndarray, size: int = 256) -> Iterator[np.ndarray]:
+	"""Yield ``render(*params)`` in batches of ``size`` figures drawn into one reused buffer.
+
+	Each yielded array is overwritten by the next batch; encode or copy it
+	before advancing.
+	"""
+	out = None
+	for start in range(0, len(params[0]), size):
+		imgs = render(*(p[start:start + size] for p in params), out=out)
+		if out is None:
+			out = imgs
+		yield imgs
+
+
+def encode(imgs: np.ndarray, paths: Sequence[str]) -> None:
+	# One manifest update per output directory for the whole batch
+	by_dir: Dict[str, Dict[str, bytes]] = {}
+	for img, path in zip(imgs, paths):
+		out = Image.fromarray(img, "P")
+		out.putpalette(PALETTE)
+		directory, name = os.path.split(path)
+		by_dir.setdefault(directory or ".", {})[name] = png_bytes(out)
+	for directory, artifacts in by_dir.items():
+		write_artifacts(directory, artifacts)
+
+
+# ---------- Benchmark against per-figure ImageDraw ----------
+
+def pil_line_chart(series: List[int], lo: int, hi: int, w: int = 520, h: int = 280, left: int = 50) -> Image.Image:
+	img = Image.new("RGB", (w, h), "white")
+	d = ImageDraw.Draw(img)
+	d.line((left, 20, left, h - 40), fill="black", width=2)
+	d.line((left, h - 40, w - 20, h - 40), fill="black", width=2)
+	k = len(series)
+	points = [(left + t * (w - 100) // (k - 1), h - 40 - (alt - lo) * (h - 80) // (hi - lo)) for t, alt in enumerate(series)]
+	d.line(points, fill="blue", width=3)
+	return img
+
+
+def pil_shaded_grid(shade: np.ndarray, w: int = 390, h: int = 260) -> Image.Image:
+	img = Image.new("RGB", (w, h), "white")
+	d = ImageDraw.Draw(img)
+	rows, cols = shade.shape
+	cell_w, cell_h = w // cols, h // rows
+	for r in range(rows):
+		for c in range(cols):
+			x0, y0 = c * cell_w, r * cell_h
+			x1, y1 = x0 + cell_w - 2, y0 + cell_h - 2
+			if shade[r, c] >= 1:
+				d.rectangle((x0 + 2, y0 + 2, x1, y1), fill=(185, 185, 185))
+			elif shade[r, c] > 0:
+				d.rectangle((x0 + cell_w // 2, y0 + 2, x1, y1), fill=(185, 185, 185))
+			d.rectangle((x0 + 2, y0 + 2, x1, y1), outline="black", width=3)
+	return img
+
+
+def pil_shape_cycle(codes: np.ndarray, w: int = 720, h: int = 150, size: int = 50, step: int = 70, left: int = 20, top: int = 25) -> Image.Image:
+	img = Image.new("RGB", (w, h), "white")
+	d = ImageDraw.Draw(img)
+	r = size // 2 - 2
+	for i, code in enumerate(codes):
+		x0, y0 = left + i * step, top
+		c = (x0 + size / 2, y0 + size / 2)
+		ring = [(c[0] + r * math.cos(-math.pi / 2 + k * 2 * math.pi / 5), c[1] + r * math.sin(-math.pi / 2 + k * 2 * math.pi / 5)) for k in range(5)]
+		shape = SHAPES[code]
+		if shape == "circle":
+			d.ellipse((x0, y0, x0 + size, y0 + size), outline="black", width=3)
+		elif shape == "square":
+			d.rectangle((x0, y0, x0 + size, y0 + size), outline="black", width=3)
+		elif shape == "triangle":
+			d.polygon([(x0 + size / 2, y0), (x0 + size, y0 + size), (x0, y0 + size)], outline="black")
+		elif shape == "star":
+			star = [ring[k] for k in [0, 2, 4, 1, 3]]
+			d.line(star + [star[0]], fill="black", width=3)
+		else:
+			d.polygon(ring, outline="black")
+	return img
+
+
+def bench(n: int = 2000) -> None:
+	"""Time the whole pipeline per family: drawing plus PNG encoding and
+	writing through the build manifest, PIL per figure against NumPy batches."""
+	rng = np.random.default_rng(0)
+	series = np.sort(rng.integers(100, 600, size=(n, 5)), axis=1)
+	lo, hi = series[:, 0].copy(), series[:, -1] + 1
+	# Shadow variants reuse a small set of shading patterns
+	shade = (rng.integers(0, 3, size=(24, 2, 3)) / 2)[rng.integers(0, 24, size=n)]
+	codes = rng.integers(0, len(SHAPES), size=(n, 10))
+
+	with tempfile.TemporaryDirectory() as tmp:
+		paths = [os.path.join(tmp, f"fig{i:05d}.png") for i in range(n)]
+
+		def rate(label: str, fn) -> float:
+			start = time.perf_counter()
+			fn()
+			per_s = n / (time.perf_counter() - start)
+			print(f"{label:40} {per_s:10.0f} figures/s")
+			return per_s
+
+		def per_figure(draw, *params) -> None:
+			for path, args in zip(paths, zip(*params)):
+				save_png(draw(*args), path)
+
+		def batched(render, *params, draw_only: bool = False) -> None:
+			done = 0
+			for imgs in batches(render, *params):
+				if not draw_only:
+					encode(imgs, paths[done:done + len(imgs)])
+				done += len(imgs)
+
+		speedups = []
+		for family, pil, render, params in (
+			("line charts", lambda s, l, h: pil_line_chart(list(s), l, h), line_charts, (series, lo, hi)),
+			("shaded grids", pil_shaded_grid, shaded_grids, (shade,)),
+			("shape cycles", pil_shape_cycle, shape_cycles, (codes,)),
+		):
+			rate(f"{family}, NumPy batches (draw only)", lambda: batched(render, *params, draw_only=True))
+			a = rate(f"{family}, PIL draw + save_png", lambda: per_figure(pil, *params))
+			b = rate(f"{family}, NumPy batches + encode", lambda: batched(render, *params))
+			speedups.append(f"{family} {b / a:.1f}x")
+		print("end-to-end speedup: " + ", ".join(speedups))
+
+
+if __name__ == "__main__":
+	# usage: python batch_figures.py [n]  -> benchmark with n figures per family
+	bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
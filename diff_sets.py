@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List
+
+from shadow_parser import figure_hash, parse_docx
+
+FIELDS = ("q", "instr", "difficulty", "opts", "ans", "exp", "subject", "unit", "topic", "figure")
+# Fields that identify "the same question" when @Order has moved
+MATCH_FIELDS = ("q", "opts")
+
+
+def load_records(path: str) -> List[dict]:
+	if os.path.isdir(path):
+		from bank import Bank
+		records = list(Bank(path).records())
+	else:
+		records = parse_docx(path)
+	for rec in records:
+		if "figure" not in rec and os.path.exists(rec.get("image", "")):
+			with open(rec["image"], "rb") as f:
+				rec["figure"] = figure_hash(f.read())
+	return records
+
+
+def normalize(value) -> str:
+	if isinstance(value, list):
+		value = "\x1f".join(map(str, value))
+	return " ".join(str(value).split()).casefold()
+
+
+def fingerprint(rec: dict) -> Dict[str, bytes]:
+	prints = {f: hashlib.blake2b(normalize(rec.get(f, "")).encode("utf-8"), digest_size=8).digest() for f in FIELDS}
+	prints["*"] = hashlib.blake2b(b"".join(prints[f] for f in FIELDS), digest_size=8).digest()
+	return prints
+
+
+def align(old: List[dict], new: List[dict], old_fp: List[dict], new_fp: List[dict]) -> List[tuple]:
+	"""Pair records of two sets without comparing texts pairwise.
+
+	Passes run from strongest to weakest evidence: identical records, then the
+	same question text or option list, then the same @Order. Each pass is a
+	hash-table lookup, so alignment is linear in the size of the sets.
+	Unpaired records come back as ``(i, None)`` or ``(None, j)``.
+	"""
+	left = set(range(len(old)))
+	right = set(range(len(new)))
+	pairs = []
+
+	def match(key) -> None:
+		index = {}
+		for j in sorted(right):
+			index.setdefault(key(new[j], new_fp[j]), []).append(j)
+		for i in sorted(left):
+			bucket = index.get(key(old[i], old_fp[i]))
+			if bucket:
+				j = bucket.pop(0)
+				left.discard(i)
+				right.discard(j)
+				pairs.append((i, j))
+
+	match(lambda rec, fp: fp["*"])
+	for field in MATCH_FIELDS:
+		match(lambda rec, fp, field=field: fp[field])
+	match(lambda rec, fp: rec.get("order"))
+	pairs.extend((i, None) for i in left)
+	pairs.extend((None, j) for j in right)
+	return pairs
+
+
+def diff_records(old: List[dict], new: List[dict]) -> List[dict]:
+	old_fp = [fingerprint(r) for r in old]
+	new_fp = [fingerprint(r) for r in new]
+	changes = []
+	for i, j in align(old, new, old_fp, new_fp):
+		a = old[i] if i is not None else None
+		b = new[j] if j is not None else None
+		if a is None or b is None:
+			rec = a or b
+			changes.append({"status": "removed" if b is None else "added", "order": rec.get("order"), "q": rec.get("q")})
+			continue
+		fa, fb = old_fp[i], new_fp[j]
+		fields = {} if fa["*"] == fb["*"] else {f: [a.get(f), b.get(f)] for f in FIELDS if fa[f] != fb[f]}
+		moved = a.get("order") != b.get("order")
+		if fields or moved:
+			changes.append({
+				"status": "changed" if fields else "moved",
+				"order": a.get("order"),
+				"new_order": b.get("order"),
+				"fields": fields,
+			})
+	changes.sort(key=lambda c: (c["order"] is None, c["order"] or 0))
+	return changes
+
+
+def format_change(change: dict) -> str:
+	if change["status"] in ("added", "removed"):
+		return f"{change['status']:8} @Order {change['order']}: {change['q']}"
+	head = f"{change['status']:8} @Order {change['order']}"
+	if change["new_order"] != change["order"]:
+		head += f" -> {change['new_order']}"
+	lines = [head]
+	for field, (a, b) in change["fields"].items():
+		lines.append(f"    {field}: {a!r} -> {b!r}")
+	return "\n".join(lines)
+
+
+if __name__ == "__main__":
+	# usage: python diff_sets.py <old.docx|bank_dir> <new.docx|bank_dir> [--json]
+	changes = diff_records(load_records(sys.argv[1]), load_records(sys.argv[2]))
+	if "--json" in sys.argv[3:]:
+		json.dump(changes, sys.stdout, ensure_ascii=False, indent=1)
+	else:
+		for change in changes:
+			print(format_change(change))
+		print(f"{len(changes)} change(s)")
@@ -0,0 +1,347 @@
+import re
+from fractions import Fraction
+from math import lcm
+from typing import Callable, Dict, List, Optional, Tuple
+
+MINUS = "−"
+
+# kind -> (solver, [error models]); every function takes the solution spec.
+# Solvers return the correct answer, error models return one wrong answer
+# (or None when the mistake does not apply to this spec).
+MODELS: Dict[str, Tuple[Callable, List[Callable]]] = {}
+
+
+def model(kind: str, solver: Callable):
+	MODELS[kind] = (solver, [])
+
+	def register(fn: Callable) -> Callable:
+		MODELS[kind][1].append(fn)
+		return fn
+	return register
+
+
+def fmt(value) -> str:
+	if isinstance(value, str):
+		return value
+	if isinstance(value, Fraction):
+		text = str(value.numerator) if value.denominator == 1 else f"{abs(value.numerator)}/{value.denominator}"
+		return (MINUS + text) if value < 0 and value.denominator != 1 else text.replace("-", MINUS)
+	if isinstance(value, float) and value.is_integer():
+		value = int(value)
+	return str(value).replace("-", MINUS)
+
+
+def unreduced(numerator: int, denominator: int) -> str:
+	# The wrong fraction as the student would write it: reducing 12/30 to 2/5
+	# would hide the mistake the model stands for
+	if denominator == 0:
+		raise ZeroDivisionError(f"{numerator}/0")
+	if denominator < 0:
+		numerator, denominator = -numerator, -denominator
+	return fmt(numerator) + "/" + str(denominator)
+
+
+# ---------- Fraction sum: a/b + c/d ----------
+
+fraction_sum = model("fraction_sum", lambda s: Fraction(*s["a"]) + Fraction(*s["b"]))
+
+
+@fraction_sum
+def add_across(s):
+	# 5/12 + 7/18 -> 12/30
+	return unreduced(s["a"][0] + s["b"][0], s["a"][1] + s["b"][1])
+
+
+@fraction_sum
+def numerators_over_lcm(s):
+	# Adds numerators without rescaling them: (5 + 7)/36
+	return unreduced(s["a"][0] + s["b"][0], lcm(s["a"][1], s["b"][1]))
+
+
+@fraction_sum
+def rescale_one(s):
+	# Rescales only the first fraction to the common denominator
+	d = lcm(s["a"][1], s["b"][1])
+	return unreduced(s["a"][0] * d // s["a"][1] + s["b"][0], d)
+
+
+@fraction_sum
+def subtract_instead(s):
+	return abs(Fraction(*s["a"]) - Fraction(*s["b"]))
+
+
+@fraction_sum
+def multiply_instead(s):
+	return Fraction(*s["a"]) * Fraction(*s["b"])
+
+
+@fraction_sum
+def product_denominator(s):
+	# Uses b*d as denominator but keeps numerators unscaled
+	return unreduced(s["a"][0] + s["b"][0], s["a"][1] * s["b"][1])
+
+
+# ---------- Position in a repeating cycle ----------
+
+cycle = model("cycle", lambda s: s["cycle"][(s["n"] - 1) % len(s["cycle"])])
+
+
+@cycle
+def zero_based_index(s):
+	# Uses n mod L as a 0-based index: one position too far
+	return s["cycle"][s["n"] % len(s["cycle"])]
+
+
+@cycle
+def one_short(s):
+	return s["cycle"][(s["n"] - 2) % len(s["cycle"])]
+
+
+@cycle
+def remainder_zero_is_first(s):
+	# Reads remainder 0 as "the first shape" instead of the last
+	r = s["n"] % len(s["cycle"])
+	return s["cycle"][0] if r == 0 else None
+
+
+@cycle
+def quotient_as_index(s):
+	return s["cycle"][(s["n"] // len(s["cycle"]) - 1) % len(s["cycle"])]
+
+
+@cycle
+def outside_cycle(s):
+	return s.get("extra")
+
+
+# ---------- Linear expression: start (op) variable ----------
+
+OPS = {"+": "{a} + {x}", "-": "{a} " + MINUS + " {x}", "*": "{a}{x}", "/": "{a}/{x}", "r/": "{x}/{a}"}
+linear_expr = model("linear_expr", lambda s: OPS[s["op"]].format(**s))
+
+
+def wrong_op(op: str):
+	def error(s):
+		return None if s["op"] == op else OPS[op].format(**s)
+	error.__name__ = f"wrong_op_{op}"
+	return error
+
+
+for _op in OPS:
+	linear_expr(wrong_op(_op))
+
+
+# ---------- x = x^2 + p*x with x nonzero ----------
+
+nonzero_root = model("nonzero_root", lambda s: 1 - s["p"])
+
+
+@nonzero_root
+def drop_nonzero_condition(s):
+	return 0
+
+
+@nonzero_root
+def forget_to_move_x(s):
+	# Solves x^2 + p*x = 0 instead of x^2 + (p - 1)x = 0
+	return -s["p"]
+
+
+@nonzero_root
+def sign_error(s):
+	return s["p"] - 1
+
+
+@nonzero_root
+def off_by_one_root(s):
+	return 2 - s["p"]
+
+
+# ---------- Arithmetic expression with + - × ÷ ^ ----------
+
+TOKEN = re.compile(r"\d+(?:\.\d+)?|[-+×x*÷/^()]")
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
+
+
+def tokenize(expr: str) -> List[str]:
+	# A minus at the start, after an operator or after "(" is unary ("neg")
+	expr = expr.replace(MINUS, "-")
+	tokens = []
+	for t in TOKEN.findall(expr):
+		t = {"×": "*", "x": "*", "÷": "/"}.get(t, t)
+		if t == "-" and (not tokens or tokens[-1] in PRECEDENCE or tokens[-1] in ("(", "neg")):
+			t = "neg"
+		tokens.append(t)
+	return tokens
+
+
+def apply(op: str, a: Fraction, b: Fraction) -> Fraction:
+	if op == "+":
+		return a + b
+	if op == "-":
+		return a - b
+	if op == "*":
+		return a * b
+	if op == "/":
+		return a / b
+	return a ** int(b)
+
+
+def evaluate(tokens: List[str], precedence: Dict[str, int]) -> Fraction:
+	# Shunting-yard; equal precedence everywhere gives left-to-right evaluation.
+	# Unary minus binds to the operand that follows it, whatever the model's
+	# precedence table says.
+	values, ops = [], []
+
+	def reduce() -> None:
+		b, a = values.pop(), values.pop()
+		values.append(apply(ops.pop(), a, b))
+
+	def negate_pending() -> None:
+		while ops and ops[-1] == "neg":
+			ops.pop()
+			values.append(-values.pop())
+
+	for t in tokens:
+		if t in ("(", "neg"):
+			ops.append(t)
+		elif t == ")":
+			while ops[-1] != "(":
+				reduce()
+			ops.pop()
+			negate_pending()
+		elif t in precedence:
+			while ops and ops[-1] != "(" and precedence[ops[-1]] >= precedence[t] and t != "^":
+				reduce()
+			ops.append(t)
+		else:
+			values.append(Fraction(t))
+			negate_pending()
+	while ops:
+		reduce()
+	return values[0]
+
+
+expression = model("expression", lambda s: evaluate(tokenize(s["expr"]), PRECEDENCE))
+
+
+@expression
+def left_to_right(s):
+	return evaluate(tokenize(s["expr"]), dict.fromkeys(PRECEDENCE, 1))
+
+
+@expression
+def add_before_multiply(s):
+	return evaluate(tokenize(s["expr"]), {"+": 3, "-": 3, "*": 2, "/": 2, "^": 4})
+
+
+@expression
+def power_as_product(s):
+	tokens = ["*" if t == "^" else t for t in tokenize(s["expr"])]
+	return evaluate(tokens, PRECEDENCE)
+
+
+@expression
+def ignore_parentheses(s):
+	return evaluate([t for t in tokenize(s["expr"]) if t not in "()"], PRECEDENCE)
+
+
+# ---------- Generation ----------
+
+def fallbacks(spec: dict, answer) -> list:
+	# Used when the error models run dry: numeric near misses, or the other
+	# members of a cycle
+	if isinstance(answer, (int, float, Fraction)):
+		return [answer + 1, answer - 1, answer * 2, answer + 2, answer - 2, answer + 10]
+	return list(spec.get("cycle", []))
+
+
+def numeric(value) -> Optional[Fraction]:
+	# Value behind an option, so "2/4" and "1/2" compare equal; None for
+	# non-numeric options such as shape names or expressions
+	if isinstance(value, str):
+		try:
+			return Fraction(value.replace(MINUS, "-"))
+		except (ValueError, ZeroDivisionError):
+			return None
+	return Fraction(value)
+
+
+def misread(error: Callable, spec: dict):
+	try:
+		return error(spec)
+	except ArithmeticError:
+		return None
+
+
+def generate_distractors(spec: dict, count: int = 4) -> Tuple[str, List[str]]:
+	"""Return ``(answer, distractors)`` for a solution spec.
+
+	Distractors come from the kind's error models in registration order, then
+	from fallbacks; duplicates, anything equal in value to the answer (an
+	unreduced ``2/4`` for ``1/2``) and (for specs with ``"positive": True``)
+	non-positive values are dropped. A model whose
+	mistake is undefined for this spec (e.g. it divides by zero) is skipped.
+	"""
+	solver, errors = MODELS[spec["kind"]]
+	answer = solver(spec)
+	seen = {fmt(answer)}
+	seen_values = {numeric(answer)} - {None}
+	out = []
+	for value in [misread(e, spec) for e in errors] + fallbacks(spec, answer):
+		if value is None:
+			continue
+		number = numeric(value)
+		if spec.get("positive") and number is not None and number <= 0:
+			continue
+		text = fmt(value)
+		if text not in seen and number not in seen_values:
+			seen.add(text)
+			if number is not None:
+				seen_values.add(number)
+			out.append(text)
+		if len(out) == count:
+			break
+	if len(out) < count:
+		raise ValueError(f"only {len(out)} distractors for {spec}")
+	return fmt(answer), out
+
+
+def batch_distractors(specs: List[dict], count: int = 4) -> Tuple[List[Optional[Tuple[str, List[str]]]], Dict[int, str]]:
+	"""Generate for every spec; returns ``(results, failures)``.
+
+	A spec that cannot be solved or cannot yield ``count`` distractors gets
+	``None`` in ``results`` and an entry ``index -> error`` in ``failures``
+	instead of aborting the batch.
+	"""
+	results, failures = [], {}
+	for i, spec in enumerate(specs):
+		try:
+			results.append(generate_distractors(spec, count))
+		except (ValueError, KeyError, TypeError, IndexError, ArithmeticError) as e:
+			results.append(None)
+			failures[i] = f"{type(e).__name__}: {e}"
+	return results, failures
+
+
+# Solutions for the Set A items these models cover, keyed by @Order
+SET_A_SOLUTIONS = {
+	2: {"kind": "cycle", "n": 12, "cycle": ["Circle", "Square", "Triangle", "Star"], "extra": "Hexagon"},
+	3: {"kind": "linear_expr", "a": 15, "x": "x", "op": "+"},
+	5: {"kind": "fraction_sum", "a": (5, 12), "b": (7, 18), "positive": True},
+	11: {"kind": "nonzero_root", "p": -2},
+	20: {"kind": "expression", "expr": "5 + (8 × 2^3 ÷ 4) + 2^2", "positive": True},
+}
+
+
+if __name__ == "__main__":
+	# usage: python distractors.py  -> compare with the hand-written Set A options
+	from generate_shadow_doc import build_questions
+
+	by_order = {q["order"]: q for q in build_questions()}
+	for order, spec in SET_A_SOLUTIONS.items():
+		answer, wrong = generate_distractors(spec)
+		item = by_order[order]
+		print(f"@Order {order}: answer {answer} (authored {item['ans']})")
+		print("  generated:", wrong)
+		print("  authored: ", [o for o in item["opts"] if o != item["ans"]])
@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from html import escape
+from typing import Dict, Iterable, TextIO
+
+from bank import Bank
+from vector_figures import figure_bytes
+
+# Base64 figures kept by the Moodle writer; shared figures repeat close
+# together, and a bound keeps memory flat however many distinct figures exist
+EMBED_CACHE_SIZE = 32
+
+
+class MediaStore:
+	"""Copies each distinct figure once into ``media/<sha256>.<ext>``.
+
+	Vector-twinned figures that were never written as PNGs are rasterized.
+
+	Hashes are cached per source path, so a figure shared by many questions is
+	read and hashed only the first time it is seen.
+	"""
+
+	def __init__(self, out_dir: str) -> None:
+		self.out_dir = out_dir
+		self.media_dir = os.path.join(out_dir, "media")
+		os.makedirs(self.media_dir, exist_ok=True)
+		self.refs: Dict[str, str] = {}
+
+	def ref(self, path: str) -> str:
+		if path not in self.refs:
+			data = figure_bytes(path)
+			name = hashlib.sha256(data).hexdigest()[:16] + os.path.splitext(path)[1]
+			target = os.path.join(self.media_dir, name)
+			if not os.path.exists(target):
+				with open(target, "wb") as f:
+					f.write(data)
+			self.refs[path] = f"media/{name}"
+		return self.refs[path]
+
+
+class JsonlWriter:
+	ext = "jsonl"
+
+	def __init__(self, f: TextIO, title: str, media: MediaStore) -> None:
+		self.f = f
+
+	def write(self, item: dict, figure: str) -> None:
+		out = {k: v for k, v in item.items() if k != "image"}
+		if figure:
+			out["figure"] = figure
+		self.f.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+	def close(self) -> None:
+		pass
+
+
+class HtmlWriter:
+	ext = "html"
+
+	def __init__(self, f: TextIO, title: str, media: MediaStore) -> None:
+		self.f = f
+		f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{escape(title)}</title>\n'
+			"<style>.correct{font-weight:bold}section{margin-bottom:2em}img{max-width:3.5in}</style>\n"
+			f"</head><body>\n<h1>{escape(title)}</h1>\n")
+
+	def write(self, item: dict, figure: str) -> None:
+		parts = [f'<section id="q{item["order"]}"><h2>@Order {item["order"]}</h2>',
+			f'<p class="meta">{escape(item["unit"])} / {escape(item["topic"])} / {item["difficulty"]}</p>',
+			f'<p class="question">{escape(item["q"])}</p>',
+			f'<p class="instruction"><em>{escape(item.get("instr", ""))}</em></p>']
+		if figure:
+			parts.append(f'<img src="{figure}" alt="Figure for @Order {item["order"]}">')
+		parts.append("<ol type=\"A\">")
+		for opt in item["opts"]:
+			cls = ' class="correct"' if opt == item["ans"] else ""
+			parts.append(f"<li{cls}>{escape(opt)}</li>")
+		parts.append(f'</ol><p class="explanation">{escape(item.get("exp", ""))}</p></section>\n')
+		self.f.write("".join(parts))
+
+	def close(self) -> None:
+		self.f.write("</body></html>\n")
+
+
+class MoodleXmlWriter:
+	"""Moodle XML; figures are embedded in each question as base64 ``<file>``
+	elements referenced through ``@@PLUGINFILE@@``, since Moodle cannot
+	resolve paths relative to the import file. Recently used encodings are
+	kept in a small LRU, so repeated figures are not re-read."""
+
+	ext = "xml"
+
+	def __init__(self, f: TextIO, title: str, media: MediaStore) -> None:
+		self.f = f
+		self.media = media
+		self.encoded: "OrderedDict[str, str]" = OrderedDict()
+		f.write('<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n'
+			f'<question type="category"><category><text>$course$/{escape(title)}</text></category></question>\n')
+
+	def embed(self, figure: str) -> str:
+		if figure in self.encoded:
+			self.encoded.move_to_end(figure)
+			return self.encoded[figure]
+		with open(os.path.join(self.media.out_dir, figure), "rb") as f:
+			data = base64.b64encode(f.read()).decode("ascii")
+		self.encoded[figure] = data
+		if len(self.encoded) > EMBED_CACHE_SIZE:
+			self.encoded.popitem(last=False)
+		return data
+
+	def write(self, item: dict, figure: str) -> None:
+		text = f"<p>{escape(item['q'])}</p>"
+		files = ""
+		if figure:
+			name = os.path.basename(figure)
+			text += f'<p><img src="@@PLUGINFILE@@/{name}" alt="Figure for @Order {item["order"]}"></p>'
+			files = f'<file name="{name}" path="/" encoding="base64">{self.embed(figure)}</file>'
+		parts = ['<question type="multichoice">',
+			f"<name><text>@Order {item['order']}</text></name>",
+			f'<questiontext format="html"><text>{escape(text)}</text>{files}</questiontext>',
+			f'<generalfeedback format="html"><text>{escape(item.get("exp", ""))}</text></generalfeedback>',
+			"<defaultgrade>1</defaultgrade><single>true</single><shuffleanswers>false</shuffleanswers>",
+			"<answernumbering>ABCD</answernumbering>"]
+		for opt in item["opts"]:
+			fraction = 100 if opt == item["ans"] else 0
+			parts.append(f'<answer fraction="{fraction}" format="html"><text>{escape(opt)}</text></answer>')
+		parts.append(f"<tags><tag><text>{escape(item['topic'])}</text></tag>"
+			f"<tag><text>{item['difficulty']}</text></tag></tags></question>\n")
+		self.f.write("".join(parts))
+
+	def close(self) -> None:
+		self.f.write("</quiz>\n")
+
+
+WRITERS = {"jsonl": JsonlWriter, "html": HtmlWriter, "moodle": MoodleXmlWriter}
+
+
+def export(items: Iterable[dict], out_dir: str, stem: str, title: str, formats=tuple(WRITERS)) -> int:
+	"""Stream ``items`` into every requested format in a single pass."""
+	os.makedirs(out_dir, exist_ok=True)
+	media = MediaStore(out_dir)
+	files = [open(os.path.join(out_dir, f"{stem}.{WRITERS[name].ext}"), "w", encoding="utf-8", buffering=1 << 20) for name in formats]
+	writers = [WRITERS[name](f, title, media) for name, f in zip(formats, files)]
+	count = 0
+	try:
+		for item in items:
+			figure = media.ref(item["image"]) if item.get("image") else ""
+			for writer in writers:
+				writer.write(item, figure)
+			count += 1
+		for writer in writers:
+			writer.close()
+	finally:
+		for f in files:
+			f.close()
+	return count
+
+
+if __name__ == "__main__":
+	# usage: python exporters.py <bank_dir> <out_dir> [jsonl,html,moodle]
+	bank_dir, out_dir = sys.argv[1], sys.argv[2]
+	formats = tuple(sys.argv[3].split(",")) if len(sys.argv) > 3 else tuple(WRITERS)
+	start = time.perf_counter()
+	count = export(Bank(bank_dir).records(), out_dir, "bank", "Question Bank", formats)
+	print(f"exported {count} question(s) to {out_dir} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,85 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+# Modules exposing a FIGURES registry (file name -> generator)
+FIGURE_MODULES = ("generate_shadow_doc", "generate_shadow_doc_from_user")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "figure_hashes.json")
+HASH_SIZE = 16
+# Max differing bits (of HASH_SIZE * HASH_SIZE) before a figure is flagged
+THRESHOLD = 6
+
+
+def dhash(img: Image.Image, size: int = HASH_SIZE) -> str:
+	# Difference hash: compare horizontally adjacent pixels of a small
+	# grayscale thumbnail; robust to re-encoding, sensitive to moved shapes.
+	small = img.convert("L").resize((size + 1, size), Image.LANCZOS)
+	px = small.tobytes()
+	bits = 0
+	for row in range(size):
+		for col in range(size):
+			left = px[row * (size + 1) + col]
+			right = px[row * (size + 1) + col + 1]
+			bits = (bits << 1) | (left > right)
+	return f"{bits:0{size * size // 4}x}"
+
+
+def distance(a: str, b: str) -> int:
+	return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def figure_jobs() -> List[Tuple[str, str]]:
+	jobs = []
+	for module in FIGURE_MODULES:
+		jobs.extend((module, name) for name in importlib.import_module(module).FIGURES)
+	return jobs
+
+
+def render_hash(job: Tuple[str, str]) -> Tuple[str, str]:
+	module, name = job
+	generator = importlib.import_module(module).FIGURES[name]
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, name)
+		generator(path)
+		with Image.open(path) as img:
+			return f"{module}:{name}", dhash(img)
+
+
+def hash_all(workers: int = None) -> Dict[str, str]:
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		return dict(pool.map(render_hash, figure_jobs(), chunksize=8))
+
+
+def check(current: Dict[str, str], baseline: Dict[str, str], threshold: int = THRESHOLD) -> List[str]:
+	problems = []
+	for key, digest in sorted(current.items()):
+		if key not in baseline:
+			problems.append(f"new figure {key} (run with --update to record it)")
+		elif distance(digest, baseline[key]) > threshold:
+			problems.append(f"changed {key}: {distance(digest, baseline[key])} bits differ")
+	for key in sorted(set(baseline) - set(current)):
+		problems.append(f"missing figure {key}")
+	return problems
+
+
+if __name__ == "__main__":
+	# usage: python figure_regression.py [--update]
+	current = hash_all()
+	if "--update" in sys.argv[1:]:
+		with open(BASELINE, "w", encoding="utf-8") as f:
+			json.dump(current, f, indent=1, sort_keys=True)
+		print(f"recorded {len(current)} figure hashes in {BASELINE}")
+		sys.exit(0)
+	with open(BASELINE, encoding="utf-8") as f:
+		baseline = json.load(f)
+	problems = check(current, baseline)
+	for line in problems:
+		print(line)
+	print(f"{len(current)} figures checked, {len(problems)} problem(s)")
+	sys.exit(1 if problems else 0)
@@ -3,6 +3,8 @@ from docx import Document
 from docx.shared import Inches, Pt
 from PIL import Image, ImageDraw
 import math
+from artifacts import save_document, save_png
+from vector_figures import VECTOR_FIGURES, add_figure, vec_circle_in_square, vec_midpoints
 
 OUTPUT_DIR = "/workspace/shadow_questions"
 IMAGES_DIR = os.path.join(OUTPUT_DIR, "images")
@@ -44,23 +46,11 @@ def img_sequence(path: str) -> None:
 				pts.append((cx + r * math.cos(ang), cy + r * math.sin(ang)))
 			star = [pts[i % 5] for i in [0, 2, 4, 1, 3]]
 			d.line(star + [star[0]], fill="black", width=3)
-	img.save(path)
+	save_png(img, path)
 
 
 def img_midpoints(path: str) -> None:
-	w, h = 660, 120
-	img = Image.new("RGB", (w, h), "white")
-	d = ImageDraw.Draw(img)
-	margin = 30
-	R = (margin, h // 2)
-	S = (margin + 120, h // 2)
-	T = (margin + 240, h // 2)
-	V = (margin + 480, h // 2)
-	d.line((R, V), fill="black", width=3)
-	for label, pt in [("R", R), ("S", S), ("T", T), ("V", V)]:
-		d.ellipse((pt[0] - 4, pt[1] - 4, pt[0] + 4, pt[1] + 4), fill="black")
-		d.text((pt[0] - 6, pt[1] - 24), label, fill="black")
-	img.save(path)
+	save_png(vec_midpoints().rasterize(), path)
 
 
 def img_rect_squares(path: str) -> None:
@@ -76,7 +66,7 @@ def img_rect_squares(path: str) -> None:
 			if (c, r) in shaded:
 				d.rectangle((x0 + 2, y0 + 2, x1, y1), fill=(185, 185, 185))
 			d.rectangle((x0 + 2, y0 + 2, x1, y1), outline="black", width=3)
-	img.save(path)
+	save_png(img, path)
 
 
 def img_altitude(path: str) -> None:
@@ -96,16 +86,11 @@ def img_altitude(path: str) -> None:
 		y = h - 40 - int((alt - 200) * (h - 80) / (550 - 200))
 		points.append((x, y))
 	d.line(points[1:], fill="blue", width=3)
-	img.save(path)
+	save_png(img, path)
 
 
 def img_circle_in_square(path: str) -> None:
-	w, h = 280, 280
-	img = Image.new("RGB", (w, h), "white")
-	d = ImageDraw.Draw(img)
-	d.rectangle((20, 20, w - 20, h - 20), outline="black", width=3)
-	d.ellipse((20, 20, w - 20, h - 20), outline="black", width=3)
-	img.save(path)
+	save_png(vec_circle_in_square().rasterize(), path)
 
 
 def build_questions():
@@ -419,39 +404,55 @@ def build_questions():
 	]
 
 
+# Figure file name -> generator, shared by build_doc and the parallel builder
+FIGURES = {
+	"sequence.png": img_sequence,
+	"midpoints.png": img_midpoints,
+	"rect_squares.png": img_rect_squares,
+	"altitude.png": img_altitude,
+	"circle_in_square.png": img_circle_in_square,
+}
+
+
+def generate_images(skip=()) -> None:
+	for name, generator in FIGURES.items():
+		if name not in skip:
+			generator(os.path.join(IMAGES_DIR, name))
+
+
+def add_question(doc: Document, item: dict) -> None:
+	add_mono_line(doc, "@question " + item["q"]) 
+	add_mono_line(doc, "@instruction " + item["instr"]) 
+	add_mono_line(doc, "@difficulty " + item["difficulty"]) 
+	add_mono_line(doc, f"@Order {item['order']}")
+	for opt in item["opts"]:
+		prefix = "@@option " if opt == item["ans"] else "@option "
+		add_mono_line(doc, prefix + opt)
+	add_mono_line(doc, "@explanation ")
+	add_mono_line(doc, item["exp"]) 
+	add_mono_line(doc, "@subject " + item["subject"]) 
+	add_mono_line(doc, "@unit " + item["unit"]) 
+	add_mono_line(doc, "@topic " + item["topic"]) 
+	add_mono_line(doc, "@plusmarks 1")
+	if "image" in item:
+		doc.add_paragraph()
+		add_figure(doc, item["image"], Inches(3.5))
+		doc.add_paragraph()
+	doc.add_paragraph()
+
+
 def build_doc(path: str) -> None:
 	doc = Document()
 	add_mono_line(doc, "@title Quantitative Reasoning Shadow Set A")
 	add_mono_line(doc, "@description 25 MCQ shadow questions inspired by provided base set with images where applicable")
 	questions = build_questions()
 	# Generate images needed
-	img_sequence(os.path.join(IMAGES_DIR, "sequence.png"))
-	img_midpoints(os.path.join(IMAGES_DIR, "midpoints.png"))
-	img_rect_squares(os.path.join(IMAGES_DIR, "rect_squares.png"))
-	img_altitude(os.path.join(IMAGES_DIR, "altitude.png"))
-	img_circle_in_square(os.path.join(IMAGES_DIR, "circle_in_square.png"))
+	generate_images(skip=VECTOR_FIGURES)
 	# Add questions
 	for item in questions:
-		add_mono_line(doc, "@question " + item["q"]) 
-		add_mono_line(doc, "@instruction " + item["instr"]) 
-		add_mono_line(doc, "@difficulty " + item["difficulty"]) 
-		add_mono_line(doc, f"@Order {item['order']}")
-		for opt in item["opts"]:
-			prefix = "@@option " if opt == item["ans"] else "@option "
-			add_mono_line(doc, prefix + opt)
-		add_mono_line(doc, "@explanation ")
-		add_mono_line(doc, item["exp"]) 
-		add_mono_line(doc, "@subject " + item["subject"]) 
-		add_mono_line(doc, "@unit " + item["unit"]) 
-		add_mono_line(doc, "@topic " + item["topic"]) 
-		add_mono_line(doc, "@plusmarks 1")
-		if "image" in item:
-			doc.add_paragraph()
-			doc.add_picture(item["image"], width=Inches(3.5))
-			doc.add_paragraph()
-		doc.add_paragraph()
+		add_question(doc, item)
 	# Save
-	doc.save(path)
+	save_document(doc, path)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ from docx import Document
 from docx.shared import Inches, Pt
 from PIL import Image, ImageDraw
 import math
+from artifacts import save_document, save_png
+from vector_figures import VECTOR_FIGURES, add_figure, vec_card_holes, vec_midpoints_generic, vec_segments_two_squares
 
 OUTPUT_DIR = "/workspace/shadow_questions"
 IMAGES_DIR = os.path.join(OUTPUT_DIR, "images_user")
@@ -51,7 +53,7 @@ def img_sequence_5cycle(path: str) -> None:
 				ang = -math.pi / 2 + k * 2 * math.pi / 5
 				pts.append((cx + r * math.cos(ang), cy + r * math.sin(ang)))
 			d.polygon(pts, outline="black")
-	img.save(path)
+	save_png(img, path)
 
 
 def img_altitude_100_to_500(path: str) -> None:
@@ -68,25 +70,11 @@ def img_altitude_100_to_500(path: str) -> None:
 		y = h - 40 - int((alt - 100) * (h - 80) / (500 - 100))
 		points.append((x, y))
 	d.line(points, fill="blue", width=3)
-	img.save(path)
+	save_png(img, path)
 
 
 def img_midpoints_generic(path: str) -> None:
-	w, h = 660, 140
-	img = Image.new("RGB", (w, h), "white")
-	d = ImageDraw.Draw(img)
-	margin = 40
-	R = (margin, h // 2)
-	S = (margin + 140, h // 2)
-	T = (margin + 280, h // 2)
-	V = (margin + 560, h // 2)
-	d.line((R, V), fill="black", width=3)
-	for label, pt in [("R", R), ("S", S), ("T", T), ("V", V)]:
-		d.ellipse((pt[0] - 4, pt[1] - 4, pt[0] + 4, pt[1] + 4), fill="black")
-		d.text((pt[0] - 6, pt[1] - 24), label, fill="black")
-	# annotate ST
-	d.text(((S[0] + T[0]) // 2 - 14, S[1] + 10), "ST=12", fill="black")
-	img.save(path)
+	save_png(vec_midpoints_generic().rasterize(), path)
 
 
 def img_rect_squares_7_12(path: str) -> None:
@@ -111,45 +99,36 @@ def img_rect_squares_7_12(path: str) -> None:
 	d.rectangle((x0 + cell_w // 2, y0 + 2, x1, y1), fill=(185, 185, 185))
 	# redraw the cell border
 	d.rectangle((x0 + 2, y0 + 2, x1, y1), outline="black", width=3)
-	img.save(path)
+	save_png(img, path)
 
 
 def img_card_holes(path: str) -> None:
-	w, h = 280, 280
-	img = Image.new("RGB", (w, h), "white")
-	d = ImageDraw.Draw(img)
-	d.rectangle((20, 20, w - 20, h - 20), outline="black", width=3)
-	d.ellipse((80, 90, 100, 110), outline="black", width=3)
-	d.ellipse((180, 160, 200, 180), outline="black", width=3)
-	img.save(path)
+	save_png(vec_card_holes().rasterize(), path)
 
 
 def img_segments_two_squares(path: str) -> None:
-	w, h = 720, 200
-	img = Image.new("RGB", (w, h), "white")
-	d = ImageDraw.Draw(img)
-	# horizontal base line
-	y = h // 2
-	left = 40
-	lengths = [180, 240, 300]  # proportional to 6,8,10
-	labels = ["AB=6 cm", "CD=8 cm", "EF=10 cm"]
-	x = left
-	for i, L in enumerate(lengths):
-		d.line((x, y, x + L, y), fill="black", width=4)
-		d.text((x + L // 2 - 30, y + 10), labels[i], fill="black")
-		# draw square at joints between segments (after first two)
-		if i < 2:
-			# square of side proportional to 2 cm
-			s = 60
-			d.rectangle((x + L - s // 2, y - s - 10, x + L - s // 2 + s, y - 10), outline="black", width=3)
-		x += L
-	img.save(path)
+	save_png(vec_segments_two_squares().rasterize(), path)
 
 
-def build_doc(path: str) -> None:
-	doc = Document()
-	# Title/description not numbered; then 25 items below
-	content_blocks = [
+# Figure file name -> generator, mirrors FIGURES in generate_shadow_doc
+FIGURES = {
+	"sequence5.png": img_sequence_5cycle,
+	"altitude_100_500.png": img_altitude_100_to_500,
+	"midpoints_user.png": img_midpoints_generic,
+	"rect_7_12.png": img_rect_squares_7_12,
+	"card_holes_user.png": img_card_holes,
+	"segments_squares.png": img_segments_two_squares,
+}
+
+
+def generate_images(skip=()) -> None:
+	for name, generator in FIGURES.items():
+		if name not in skip:
+			generator(os.path.join(IMAGES_DIR, name))
+
+
+def build_content_blocks():
+	return [
 		{
 			"title": "Solve Linear Equation (One-Step)",
 			"desc": "Solve for n in a simple linear equation.",
@@ -507,13 +486,14 @@ def build_doc(path: str) -> None:
 			"topic": "Fractions, Decimals, & Percents",
 		},
 	]
+
+
+def build_doc(path: str) -> None:
+	doc = Document()
+	# Title/description not numbered; then 25 items below
+	content_blocks = build_content_blocks()
 	# Generate images
-	img_sequence_5cycle(os.path.join(IMAGES_DIR, "sequence5.png"))
-	img_altitude_100_to_500(os.path.join(IMAGES_DIR, "altitude_100_500.png"))
-	img_midpoints_generic(os.path.join(IMAGES_DIR, "midpoints_user.png"))
-	img_rect_squares_7_12(os.path.join(IMAGES_DIR, "rect_7_12.png"))
-	img_card_holes(os.path.join(IMAGES_DIR, "card_holes_user.png"))
-	img_segments_two_squares(os.path.join(IMAGES_DIR, "segments_squares.png"))
+	generate_images(skip=VECTOR_FIGURES)
 	# Write to doc in required format
 	for block in content_blocks:
 		add_mono_line(doc, f"@title {block['title']}")
@@ -534,10 +514,10 @@ def build_doc(path: str) -> None:
 		add_mono_line(doc, "@plusmarks 1")
 		if "image" in block:
 			doc.add_paragraph()
-			doc.add_picture(block["image"], width=Inches(3.7))
+			add_figure(doc, block["image"], Inches(3.7))
 			doc.add_paragraph()
 		add_mono_line(doc, "\n---\n")
-	doc.save(path)
+	save_document(doc, path)
 
 
 if __name__ == "__main__":
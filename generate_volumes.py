@@ -0,0 +1,158 @@
+import json
+import os
+import re
+import sys
+from typing import Iterable, List, Optional
+
+from docx import Document
+
+from artifacts import document_bytes, write_if_changed
+from generate_shadow_doc import OUTPUT_DIR, add_mono_line, add_question, build_questions, ensure_dirs, generate_images
+from vector_figures import VECTOR_FIGURES
+
+# Rough size of one Courier paragraph in document.xml, used for the byte budget
+PARAGRAPH_OVERHEAD = 420
+
+
+def estimate_text_bytes(item: dict) -> int:
+	# Uncompressed document.xml taken by one question: the text of its tag
+	# lines plus per-paragraph markup. Scaled by the measured compression ratio.
+	text = [item["q"], item["instr"], item["difficulty"], item["exp"], item["subject"], item["unit"], item["topic"]]
+	text.extend(item["opts"])
+	size = sum(len(t.encode("utf-8")) for t in text)
+	return size + (len(item["opts"]) + 12) * PARAGRAPH_OVERHEAD
+
+
+def figure_bytes(item: dict) -> int:
+	# PNGs are stored as they are; vector twins add only a little markup
+	if "image" not in item or os.path.basename(item["image"]) in VECTOR_FIGURES:
+		return 0
+	return os.path.getsize(item["image"])
+
+
+def new_volume(title: str, description: str, number: int) -> Document:
+	doc = Document()
+	add_mono_line(doc, f"@title {title} (Volume {number})")
+	add_mono_line(doc, "@description " + description)
+	return doc
+
+
+def build_volumes(
+	questions: Iterable[dict],
+	out_dir: str,
+	stem: str,
+	title: str,
+	description: str,
+	max_questions: Optional[int] = None,
+	max_bytes: Optional[int] = None,
+) -> str:
+	"""Stream questions into numbered volume files and write an @Order manifest.
+
+	A new volume is started once the current one holds ``max_questions`` items
+	or adding the next item would exceed ``max_bytes``. Sizes are estimated as
+	the measured size of an empty volume plus, per question, its figure bytes
+	and its text estimate scaled by a compression ratio; whenever the estimate
+	says a volume is full, the volume is serialized to check its real size and
+	recalibrate the ratio, and a volume that still comes out over budget hands
+	its last questions to the next one. Volume files of an earlier, longer run
+	are removed. Only one volume (its Document and question list) is alive at
+	a time, so peak memory does not grow with the number of questions.
+	Returns the manifest path.
+	"""
+	if max_questions is None and max_bytes is None:
+		raise ValueError("build_volumes needs max_questions or max_bytes")
+	os.makedirs(out_dir, exist_ok=True)
+	# Fixed package cost (styles, theme, settings...) paid by every volume
+	base = len(document_bytes(new_volume(title, description, 1)))
+	if max_bytes is not None and base >= max_bytes:
+		raise ValueError(f"max_bytes={max_bytes} is below the size of an empty volume ({base} bytes)")
+	volumes = []
+	orders = {}
+	doc = None
+	batch = []
+	used = 0
+	ratio = 1.0
+
+	def add(item: dict) -> None:
+		nonlocal doc, used
+		if doc is None:
+			doc = new_volume(title, description, len(volumes) + 1)
+			used = base
+		add_question(doc, item)
+		batch.append(item)
+		used += estimate_text_bytes(item) * ratio + figure_bytes(item)
+
+	def measure() -> bytes:
+		# Serialize the open volume and re-derive the compression ratio from it
+		nonlocal ratio, used
+		data = document_bytes(doc)
+		text = sum(estimate_text_bytes(item) for item in batch)
+		if text:
+			ratio = max(0.01, (len(data) - base - sum(figure_bytes(item) for item in batch)) / text)
+		used = len(data)
+		return data
+
+	def close() -> List[dict]:
+		# Write the open volume; if the estimate let it run over max_bytes, move
+		# trailing questions to the next volume until the real size fits
+		nonlocal doc
+		data = measure()
+		carry = []
+		while max_bytes is not None and len(data) > max_bytes and len(batch) > 1:
+			carry.insert(0, batch.pop())
+			kept = batch[:]
+			batch.clear()
+			doc = None
+			for item in kept:
+				add(item)
+			data = measure()
+		number = len(volumes) + 1
+		name = f"{stem}_vol{number:03d}.docx"
+		write_if_changed(os.path.join(out_dir, name), data)
+		volumes.append({"file": name, "questions": len(batch), "bytes": len(data)})
+		for item in batch:
+			orders[str(item["order"])] = number
+		batch.clear()
+		doc = None
+		return carry
+
+	for item in questions:
+		if doc is not None:
+			full = max_questions is not None and len(batch) >= max_questions
+			if not full and max_bytes is not None and used + estimate_text_bytes(item) * ratio + figure_bytes(item) > max_bytes:
+				# The estimate says this item does not fit; confirm with the real size
+				measure()
+				full = used + estimate_text_bytes(item) * ratio + figure_bytes(item) > max_bytes
+			if full:
+				for carried in close():
+					add(carried)
+		add(item)
+	while doc is not None:
+		for carried in close():
+			add(carried)
+
+	current = {v["file"] for v in volumes}
+	pattern = re.compile(re.escape(stem) + r"_vol\d{3}\.docx")
+	for name in os.listdir(out_dir):
+		if pattern.fullmatch(name) and name not in current:
+			os.remove(os.path.join(out_dir, name))
+	manifest = {"title": title, "volumes": volumes, "orders": orders}
+	manifest_path = os.path.join(out_dir, f"{stem}_manifest.json")
+	write_if_changed(manifest_path, json.dumps(manifest, indent=1).encode("utf-8"))
+	return manifest_path
+
+
+if __name__ == "__main__":
+	# usage: python generate_volumes.py [questions_per_volume]
+	per_volume = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+	ensure_dirs()
+	generate_images(skip=VECTOR_FIGURES)
+	manifest_path = build_volumes(
+		build_questions(),
+		os.path.join(OUTPUT_DIR, "volumes"),
+		"Quantitative_Shadow_Set_A",
+		"Quantitative Reasoning Shadow Set A",
+		"25 MCQ shadow questions inspired by provided base set with images where applicable",
+		max_questions=per_volume,
+	)
+	print(manifest_path)
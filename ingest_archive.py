@@ -0,0 +1,171 @@
+import json
+import mimetypes
+import os
+import sys
+import time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+from bank import DIFFICULTIES, Bank, append_bank, export_bank, normalize_block
+from search_index import SearchIndex
+from shadow_parser import parse_docx
+
+REQUIRED = ("q", "order", "difficulty", "subject", "unit", "topic")
+REPORT_EVERY = 500
+
+
+def find_docx(root: str) -> List[str]:
+	found = []
+	for dirpath, dirnames, filenames in os.walk(root):
+		dirnames.sort()
+		found.extend(os.path.join(dirpath, n) for n in sorted(filenames) if n.endswith(".docx") and not n.startswith("~$"))
+	return found
+
+
+def parse_one(path: str):
+	# Worker side; errors are returned, not raised, so one bad file cannot
+	# take the pool down
+	media = {}
+	try:
+		return path, parse_docx(path, media), media, None
+	except Exception as e:
+		return path, [], {}, f"{type(e).__name__}: {e}"
+
+
+def normalize_record(raw: dict, source: str) -> Optional[dict]:
+	rec = normalize_block(raw)
+	if "difficulty" in rec:
+		rec["difficulty"] = rec["difficulty"].strip().lower()
+	if any(k not in rec for k in REQUIRED) or rec["difficulty"] not in DIFFICULTIES:
+		return None
+	rec["source"] = source
+	return rec
+
+
+class Checkpoint:
+	"""Append-only progress log for one ingest state directory.
+
+	``done.log`` lists each successfully parsed file, by its path relative to
+	the archive root, together with the size of ``records.jsonl`` right after
+	its records were written; on resume the records file is cut back to the
+	last logged size, dropping output from a file that was interrupted
+	mid-write. Files that fail to parse go to ``errors.log`` only and are
+	retried on the next run.
+	"""
+
+	def __init__(self, state_dir: str) -> None:
+		# Absolute, so media paths stored in records do not depend on the cwd
+		self.state_dir = os.path.abspath(state_dir)
+		self.media_dir = os.path.join(self.state_dir, "media")
+		os.makedirs(self.media_dir, exist_ok=True)
+		self.records_path = os.path.join(self.state_dir, "records.jsonl")
+		self.done_path = os.path.join(self.state_dir, "done.log")
+		self.done = set()
+		size = 0
+		valid = 0
+		if os.path.exists(self.done_path):
+			with open(self.done_path, "rb") as f:
+				for line in f:
+					# Only a complete, newline-terminated entry counts; a line
+					# torn by a crash ends the log
+					path, _, offset = line.decode("utf-8", "replace").rstrip("\n").rpartition("\t")
+					if not line.endswith(b"\n") or not path or not offset.isdigit():
+						break
+					self.done.add(path)
+					size = int(offset)
+					valid += len(line)
+			with open(self.done_path, "ab") as f:
+				f.truncate(valid)
+		with open(self.records_path, "ab") as f:
+			f.truncate(size)
+		self.media = set(os.listdir(self.media_dir))
+
+	def store_media(self, digest: str, blob: bytes, content_type: str) -> str:
+		name = digest + (mimetypes.guess_extension(content_type) or ".bin")
+		if name not in self.media:
+			tmp = os.path.join(self.media_dir, name + ".tmp")
+			with open(tmp, "wb") as f:
+				f.write(blob)
+			os.replace(tmp, os.path.join(self.media_dir, name))
+			self.media.add(name)
+		return os.path.join(self.media_dir, name)
+
+	def commit(self, path: str, records: List[dict], error: Optional[str]) -> None:
+		# A file that failed to parse is logged but not marked done, so the
+		# next run retries it
+		if error:
+			with open(os.path.join(self.state_dir, "errors.log"), "a", encoding="utf-8") as f:
+				f.write(f"{path}\t{error}\n")
+			return
+		with open(self.records_path, "a", encoding="utf-8") as f:
+			for rec in records:
+				f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+			f.flush()
+			os.fsync(f.fileno())
+			size = f.tell()
+		with open(self.done_path, "a", encoding="utf-8") as f:
+			f.write(f"{path}\t{size}\n")
+		self.done.add(path)
+
+	def records(self) -> Iterator[dict]:
+		with open(self.records_path, encoding="utf-8") as f:
+			for line in f:
+				yield json.loads(line)
+
+
+def ingest(root: str, state_dir: str, workers: Optional[int] = None) -> int:
+	checkpoint = Checkpoint(state_dir)
+	# Files are keyed relative to the archive root, so "arch", "./arch" and an
+	# absolute path all resume the same run
+	pending = [p for p in find_docx(root) if os.path.relpath(p, root) not in checkpoint.done]
+	print(f"{len(pending)} file(s) to ingest, {len(checkpoint.done)} already done")
+	start = time.perf_counter()
+	skipped = 0
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		for n, (path, parsed, media, error) in enumerate(pool.map(parse_one, pending, chunksize=16), start=1):
+			key = os.path.relpath(path, root)
+			stored = {digest: checkpoint.store_media(digest, *media[digest]) for digest in media}
+			records = []
+			for raw in parsed:
+				rec = normalize_record(raw, key)
+				if rec is None:
+					skipped += 1
+					continue
+				if rec.get("figure") in stored:
+					rec["image"] = stored[rec["figure"]]
+				records.append(rec)
+			checkpoint.commit(key, records, error)
+			if n % REPORT_EVERY == 0 or n == len(pending):
+				elapsed = time.perf_counter() - start
+				print(f"{n}/{len(pending)} files, {n / elapsed:.1f} files/s")
+	if skipped:
+		print(f"skipped {skipped} record(s) missing required tags")
+	return len(pending)
+
+
+def update_bank(checkpoint: Checkpoint, bank_dir: str) -> int:
+	"""Bring the bank up to date with ``records.jsonl``; returns the row count.
+
+	Bank rows follow the records file, which only grows, so normally just the
+	new tail is appended (updating coverage counters and keeping row ids for
+	the search index). A bank with more rows than there are records was built
+	from other state and is exported afresh.
+	"""
+	existing = len(Bank(bank_dir)) if os.path.exists(os.path.join(bank_dir, "meta.json")) else 0
+	with open(checkpoint.records_path, "rb") as f:
+		total = sum(1 for _ in f)
+	if existing > total:
+		return export_bank(checkpoint.records(), bank_dir)
+	return append_bank(islice(checkpoint.records(), existing, None), bank_dir)
+
+
+if __name__ == "__main__":
+	# usage: python ingest_archive.py <archive_dir> <state_dir> <bank_dir> [workers]
+	archive, state_dir, bank_dir = sys.argv[1:4]
+	workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+	ingest(archive, state_dir, workers)
+	count = update_bank(Checkpoint(state_dir), bank_dir)
+	print(f"{count} question(s) in {bank_dir}")
+	added = SearchIndex(os.path.join(bank_dir, "search")).update_from_bank(Bank(bank_dir))
+	print(f"indexed {added} new question(s)")
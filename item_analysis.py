@@ -0,0 +1,81 @@
+import sys
+from typing import Dict
+
+import numpy as np
+
+from bank import Bank, set_difficulty
+
+CHUNK_ROWS = 65536
+# Proportion correct at or above which an item counts as easy / moderate
+EASY_P = 0.75
+MODERATE_P = 0.45
+OMITTED = -1
+
+
+def answer_key(bank: Bank, items: np.ndarray) -> np.ndarray:
+	key = []
+	for i in items:
+		rec = bank.record(int(i))
+		key.append(rec["opts"].index(rec["ans"]))
+	return np.asarray(key, dtype=np.int8)
+
+
+def analyze(responses: np.ndarray, key: np.ndarray, n_options: int = 5, chunk_rows: int = CHUNK_ROWS) -> Dict[str, np.ndarray]:
+	"""Classical item statistics for a students x items matrix of option indices.
+
+	``responses`` may be a memory-mapped array; it is read ``chunk_rows`` students
+	at a time, so only running sums stay in memory. Omitted answers are
+	``OMITTED`` and count as wrong. Returns per-item ``p`` (proportion correct),
+	``point_biserial`` (correlation of the item score with the total score) and
+	``pick_rates`` (items x options, plus a final column for omissions).
+	"""
+	n_students, n_items = responses.shape
+	correct = np.zeros(n_items, dtype=np.int64)
+	total_when_correct = np.zeros(n_items, dtype=np.float64)
+	picks = np.zeros((n_items, n_options + 1), dtype=np.int64)
+	total_sum = 0.0
+	total_sumsq = 0.0
+	for start in range(0, n_students, chunk_rows):
+		chunk = np.asarray(responses[start:start + chunk_rows])
+		hits = chunk == key
+		totals = hits.sum(axis=1, dtype=np.float64)
+		correct += hits.sum(axis=0)
+		total_when_correct += totals @ hits
+		total_sum += totals.sum()
+		total_sumsq += totals @ totals
+		for option in range(n_options):
+			picks[:, option] += (chunk == option).sum(axis=0)
+		picks[:, n_options] += (chunk == OMITTED).sum(axis=0)
+	p = correct / n_students
+	mean = total_sum / n_students
+	std = np.sqrt(max(total_sumsq / n_students - mean * mean, 0.0))
+	with np.errstate(divide="ignore", invalid="ignore"):
+		mean_correct = total_when_correct / correct
+		r = (mean_correct - mean) / std * np.sqrt(p / (1 - p))
+	r = np.where((correct > 0) & (correct < n_students) & (std > 0), r, np.nan)
+	return {"p": p, "point_biserial": r, "pick_rates": picks / n_students}
+
+
+def calibrate(p: np.ndarray) -> list:
+	return ["easy" if v >= EASY_P else "moderate" if v >= MODERATE_P else "hard" for v in p]
+
+
+if __name__ == "__main__":
+	# usage: python item_analysis.py <bank_dir> <responses.npy> <items.npy> [--write]
+	#   responses.npy: int8 students x items, option index or -1 when omitted
+	#   items.npy: bank row index for every response column
+	bank = Bank(sys.argv[1])
+	responses = np.load(sys.argv[2], mmap_mode="r")
+	items = np.load(sys.argv[3])
+	key = answer_key(bank, items)
+	n_options = max(len(bank.record(int(i))["opts"]) for i in items)
+	stats = analyze(responses, key, n_options)
+	levels = calibrate(stats["p"])
+	for col, i in enumerate(items):
+		rec = bank.record(int(i))
+		rates = " ".join(f"{v:.2f}" for v in stats["pick_rates"][col])
+		print(f"@Order {rec['order']:>3} p={stats['p'][col]:.3f} r_pb={stats['point_biserial'][col]:+.3f} "
+			f"{rec['difficulty']:>8} -> {levels[col]:<8} picks {rates}")
+	if "--write" in sys.argv[4:]:
+		set_difficulty(sys.argv[1], items, levels)
+		print(f"wrote calibrated difficulty for {len(items)} items")
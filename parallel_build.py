@@ -0,0 +1,99 @@
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from typing import List, Optional, Tuple
+
+from docx import Document
+from docx.oxml.ns import qn
+
+import generate_shadow_doc as shadow
+from artifacts import save_document, write_artifacts
+from shadow_parser import WPS_CNVPR
+from vector_figures import VECTOR_FIGURES
+
+
+def render_figure(name: str) -> Tuple[str, bytes]:
+	# Worker side: render into a private directory and hand the bytes back, so
+	# only the parent touches IMAGES_DIR and its manifest
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, name)
+		shadow.FIGURES[name](path)
+		with open(path, "rb") as f:
+			return name, f.read()
+
+
+def render_fragment(items: List[dict]) -> bytes:
+	# Worker side: a throwaway document holding only this slice of questions
+	doc = Document()
+	for item in items:
+		shadow.add_question(doc, item)
+	buf = io.BytesIO()
+	doc.save(buf)
+	return buf.getvalue()
+
+
+def partition(items: List[dict], parts: int) -> List[List[dict]]:
+	size = max(1, -(-len(items) // parts))
+	return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def merge_fragments(doc: Document, fragments: List[bytes]) -> Document:
+	"""Append the bodies of fragment packages to ``doc`` in order.
+
+	Pictures are re-added through the target part, so identical images from
+	different fragments collapse onto one media part (python-docx matches them
+	by SHA1) and every r:embed is rewritten to the target's relationship id.
+	Drawing ids (wp:docPr and vector shape ids) are renumbered afterwards
+	because each fragment counted its own from 1.
+	"""
+	body = doc.element.body
+	sect_pr = body.sectPr
+	for blob in fragments:
+		frag = Document(io.BytesIO(blob))
+		rids = {}
+		for child in frag.element.body.iterchildren():
+			if child.tag == qn("w:sectPr"):
+				continue
+			el = deepcopy(child)
+			for blip in el.iter(qn("a:blip")):
+				old = blip.get(qn("r:embed"))
+				if old not in rids:
+					image_blob = frag.part.related_parts[old].blob
+					rids[old], _ = doc.part.get_or_add_image(io.BytesIO(image_blob))
+				blip.set(qn("r:embed"), rids[old])
+			if sect_pr is not None:
+				sect_pr.addprevious(el)
+			else:
+				body.append(el)
+	for i, doc_pr in enumerate(body.iter(qn("wp:docPr"), WPS_CNVPR), start=1):
+		doc_pr.set("id", str(i))
+	return doc
+
+
+def build_doc_parallel(path: str, questions: Optional[List[dict]] = None, workers: Optional[int] = None) -> None:
+	questions = shadow.build_questions() if questions is None else questions
+	workers = workers or os.cpu_count() or 1
+	needed = sorted({os.path.basename(q["image"]) for q in questions if "image" in q})
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		figures = dict(pool.map(render_figure, [n for n in needed if n in shadow.FIGURES and n not in VECTOR_FIGURES]))
+		write_artifacts(shadow.IMAGES_DIR, figures)
+		fragments = list(pool.map(render_fragment, partition(questions, workers * 4)))
+	doc = Document()
+	shadow.add_mono_line(doc, "@title Quantitative Reasoning Shadow Set A")
+	shadow.add_mono_line(doc, "@description 25 MCQ shadow questions inspired by provided base set with images where applicable")
+	merge_fragments(doc, fragments)
+	save_document(doc, path)
+
+
+if __name__ == "__main__":
+	# usage: python parallel_build.py [workers]
+	workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+	shadow.ensure_dirs()
+	out_path = os.path.join(shadow.OUTPUT_DIR, "Quantitative_Shadow_Set_A.docx")
+	start = time.perf_counter()
+	build_doc_parallel(out_path, workers=workers)
+	print(out_path, f"{time.perf_counter() - start:.2f}s")
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from docx import Document
+from docx.image.exceptions import UnrecognizedImageError
+
+import generate_shadow_doc as shadow
+import generate_shadow_doc_from_user as user_shadow
+from artifacts import deterministic_zip
+from bank import normalize_block
+from vector_figures import VECTOR_FIGURES
+
+CACHE_SIZE = 256
+MAX_BODY = 32 * 1024 * 1024
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+FIGURE_SETS = (shadow, user_shadow)
+# Figure file name -> directory it is rendered into, across both sets
+FIGURE_DIRS = {name: module.IMAGES_DIR for module in FIGURE_SETS for name in module.FIGURES}
+
+RENDER_ERRORS = (KeyError, TypeError, ValueError, AttributeError, OSError, UnrecognizedImageError)
+
+
+def warm_worker() -> None:
+	# Runs once per worker process: pay for imports and the default template
+	# before the first real request arrives. Figures are rendered by the
+	# parent, so workers never write to the shared images directory.
+	Document()
+
+
+def resolve_image(block: dict) -> dict:
+	# Only the set's own figures may be embedded; a client path is never read
+	if not block.get("image"):
+		return block
+	name = os.path.basename(block["image"])
+	if name not in FIGURE_DIRS:
+		raise ValueError(f"unknown figure {block['image']!r}")
+	return dict(block, image=os.path.join(FIGURE_DIRS[name], name))
+
+
+def render_set(definition: dict) -> bytes:
+	doc = Document()
+	shadow.add_mono_line(doc, "@title " + definition.get("title", ""))
+	shadow.add_mono_line(doc, "@description " + definition.get("description", ""))
+	for block in definition["questions"]:
+		shadow.add_question(doc, resolve_image(normalize_block(block)))
+	buf = io.BytesIO()
+	doc.save(buf)
+	return deterministic_zip(buf.getvalue())
+
+
+def definition_key(definition: dict) -> str:
+	canonical = json.dumps(definition, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+	return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PreviewService:
+	"""Renders set definitions to docx bytes behind an LRU cache.
+
+	Concurrent requests for the same definition share one in-flight render
+	instead of each queueing work on the pool.
+	"""
+
+	def __init__(self, workers: Optional[int] = None, cache_size: int = CACHE_SIZE) -> None:
+		self.workers = workers or os.cpu_count() or 1
+		for module in FIGURE_SETS:
+			module.ensure_dirs()
+			module.generate_images(skip=VECTOR_FIGURES)
+		self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+		self.cache = OrderedDict()
+		self.cache_size = cache_size
+		self.inflight = {}
+
+	async def warm(self) -> None:
+		# ProcessPoolExecutor starts workers lazily; force all of them up now
+		loop = asyncio.get_running_loop()
+		await asyncio.gather(*(loop.run_in_executor(self.pool, os.getpid) for _ in range(self.workers)))
+
+	async def build(self, definition: dict):
+		key = definition_key(definition)
+		if key in self.cache:
+			self.cache.move_to_end(key)
+			return self.cache[key], "hit"
+		if key in self.inflight:
+			return await asyncio.shield(self.inflight[key]), "coalesced"
+		# The render is its own task so a client hanging up does not cancel it
+		# for the requests coalesced onto it
+		task = asyncio.ensure_future(self.render(key, definition))
+		self.inflight[key] = task
+		return await asyncio.shield(task), "miss"
+
+	async def render(self, key: str, definition: dict) -> bytes:
+		loop = asyncio.get_running_loop()
+		try:
+			data = await loop.run_in_executor(self.pool, render_set, definition)
+		finally:
+			del self.inflight[key]
+		self.cache[key] = data
+		if len(self.cache) > self.cache_size:
+			self.cache.popitem(last=False)
+		return data
+
+	def close(self) -> None:
+		self.pool.shutdown(cancel_futures=True)
+
+
+async def respond(writer: asyncio.StreamWriter, status: str, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+	lines = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}", "Connection: close"]
+	lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+	writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+	await writer.drain()
+
+
+async def handle(service: PreviewService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+	try:
+		request_line = (await reader.readline()).decode("latin-1").split()
+		headers = {}
+		while True:
+			line = (await reader.readline()).decode("latin-1").strip()
+			if not line:
+				break
+			name, _, value = line.partition(":")
+			headers[name.strip().lower()] = value.strip()
+		if len(request_line) < 2:
+			await respond(writer, "400 Bad Request", b"bad request line\n", "text/plain")
+			return
+		method, target = request_line[0], request_line[1]
+		if method == "GET" and target == "/health":
+			await respond(writer, "200 OK", b"ok\n", "text/plain")
+			return
+		if method != "POST" or target != "/build":
+			await respond(writer, "404 Not Found", b"POST /build or GET /health\n", "text/plain")
+			return
+		try:
+			length = int(headers.get("content-length", "0"))
+			if length < 0:
+				raise ValueError("negative Content-Length")
+		except ValueError as e:
+			await respond(writer, "400 Bad Request", f"bad Content-Length: {e}\n".encode("utf-8"), "text/plain")
+			return
+		if length > MAX_BODY:
+			await respond(writer, "413 Payload Too Large", b"definition too large\n", "text/plain")
+			return
+		try:
+			definition = json.loads(await reader.readexactly(length))
+			if not isinstance(definition.get("questions"), list) or not all(isinstance(q, dict) for q in definition["questions"]):
+				raise ValueError("'questions' must be a list of objects")
+		except (ValueError, AttributeError) as e:
+			await respond(writer, "400 Bad Request", f"invalid set definition: {e}\n".encode("utf-8"), "text/plain")
+			return
+		try:
+			data, cache = await service.build(definition)
+		except RENDER_ERRORS as e:
+			await respond(writer, "422 Unprocessable Entity", f"cannot render set: {e!r}\n".encode("utf-8"), "text/plain")
+			return
+		await respond(writer, "200 OK", data, DOCX_TYPE, {"X-Cache": cache})
+	except (ConnectionError, asyncio.IncompleteReadError):
+		pass
+	finally:
+		writer.close()
+
+
+async def serve(host: str, port: int, workers: Optional[int] = None) -> None:
+	service = PreviewService(workers)
+	await service.warm()
+	server = await asyncio.start_server(lambda r, w: handle(service, r, w), host, port)
+	print(f"serving on http://{host}:{port} with {service.workers} warm workers")
+	try:
+		async with server:
+			await server.serve_forever()
+	finally:
+		service.close()
+
+
+if __name__ == "__main__":
+	# usage: python preview_server.py [port] [workers]
+	port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+	workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+	asyncio.run(serve("127.0.0.1", port, workers))
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import sys
+import time
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bank import Bank
+
+TEXT_FIELDS = ("q", "instr", "exp")
+FRAC = re.compile(r"\\[dt]?frac\{([^{}]*)\}\{([^{}]*)\}")
+TOKEN = re.compile(r"\d+(?:\.\d+)?/\d+(?:\.\d+)?|[a-z0-9]+\^[a-z0-9]+|\d+(?:\.\d+)?|[^\W\d_]+")
+
+
+def tokenize(text: str) -> List[str]:
+	"""Lower-case terms with maths kept whole: ``$\\frac{5}{12}$`` and ``5/12``
+	both give ``5/12``, ``2^3`` and ``b^{2}`` stay single terms, and a
+	trailing plural ``s`` is dropped from words."""
+	text = FRAC.sub(r"\1/\2", text.lower())
+	text = text.replace("{", "").replace("}", "").replace("$", " ").replace("−", "-")
+	terms = []
+	for tok in TOKEN.findall(text):
+		if len(tok) > 3 and tok.isalpha() and tok.endswith("s") and not tok.endswith("ss"):
+			tok = tok[:-1]
+		terms.append(tok)
+	return terms
+
+
+def record_terms(rec: dict) -> set:
+	terms = set()
+	for field in TEXT_FIELDS:
+		terms.update(tokenize(rec.get(field, "")))
+	for opt in rec.get("opts", []):
+		terms.update(tokenize(opt))
+	return terms
+
+
+class SearchIndex:
+	"""Inverted index stored as immutable segments in a directory.
+
+	Each segment holds a term table (``seg-NNNNN.terms.json``: term ->
+	[offset, count]) and one sorted int32 posting array of bank row ids
+	(``seg-NNNNN.postings.npy``, memory-mapped). Adding documents writes a new
+	segment, so updates never rewrite existing postings; ``compact`` merges
+	segments when there are too many. The index remembers the bank export
+	generation it was built from and starts over when the bank is
+	re-exported.
+	"""
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		os.makedirs(path, exist_ok=True)
+		self.manifest_path = os.path.join(path, "index.json")
+		if os.path.exists(self.manifest_path):
+			with open(self.manifest_path, encoding="utf-8") as f:
+				self.manifest = json.load(f)
+		else:
+			self.manifest = {"segments": [], "docs": 0, "next": 1, "generation": ""}
+		self.segments = [self.open_segment(name) for name in self.manifest["segments"]]
+
+	def open_segment(self, name: str) -> Tuple[dict, np.ndarray]:
+		with open(os.path.join(self.path, name + ".terms.json"), encoding="utf-8") as f:
+			terms = json.load(f)
+		return terms, np.load(os.path.join(self.path, name + ".postings.npy"), mmap_mode="r")
+
+	def save_manifest(self) -> None:
+		tmp = self.manifest_path + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(self.manifest, f)
+		os.replace(tmp, self.manifest_path)
+
+	def write_segment(self, term_ids: np.ndarray, doc_ids: np.ndarray, vocab: List[str]) -> None:
+		order = np.lexsort((doc_ids, term_ids))
+		term_ids, doc_ids = term_ids[order], doc_ids[order]
+		starts = np.flatnonzero(np.r_[True, term_ids[1:] != term_ids[:-1]]) if len(term_ids) else np.zeros(0, np.intp)
+		counts = np.diff(np.r_[starts, len(term_ids)])
+		table = {vocab[term_ids[s]]: [int(s), int(c)] for s, c in zip(starts, counts)}
+		name = f"seg-{self.manifest['next']:05d}"
+		self.manifest["next"] += 1
+		np.save(os.path.join(self.path, name + ".postings.npy"), doc_ids.astype(np.int32))
+		with open(os.path.join(self.path, name + ".terms.json"), "w", encoding="utf-8") as f:
+			json.dump(table, f, ensure_ascii=False)
+		self.manifest["segments"].append(name)
+		self.segments.append(self.open_segment(name))
+
+	def add(self, docs: Iterable[Tuple[int, dict]]) -> int:
+		# Postings are gathered as flat int32 pairs rather than per-term lists
+		vocab = {}
+		term_ids, doc_ids = array("i"), array("i")
+		added = 0
+		last = self.manifest["docs"] - 1
+		for doc_id, rec in docs:
+			for term in record_terms(rec):
+				term_ids.append(vocab.setdefault(term, len(vocab)))
+				doc_ids.append(doc_id)
+			added += 1
+			last = max(last, doc_id)
+		if added:
+			self.write_segment(np.frombuffer(term_ids, np.int32), np.frombuffer(doc_ids, np.int32), list(vocab))
+			self.manifest["docs"] = last + 1
+			self.save_manifest()
+		return added
+
+	def clear(self, generation: str) -> None:
+		for name in self.manifest["segments"]:
+			for ext in (".terms.json", ".postings.npy"):
+				os.remove(os.path.join(self.path, name + ext))
+		self.manifest = {"segments": [], "docs": 0, "next": self.manifest["next"], "generation": generation}
+		self.segments = []
+		self.save_manifest()
+
+	def update_from_bank(self, bank: Bank) -> int:
+		"""Index bank rows added since the last update.
+
+		Rows of one export generation are append-only; a different generation
+		(or fewer rows than already indexed) means the bank was rewritten, so
+		the index is rebuilt from scratch.
+		"""
+		if self.manifest.get("generation") != bank.generation or self.manifest["docs"] > len(bank):
+			self.clear(bank.generation)
+		start = self.manifest["docs"]
+		return self.add((i, bank.record(i)) for i in range(start, len(bank)))
+
+	def postings(self, term: str) -> np.ndarray:
+		parts = []
+		for terms, postings in self.segments:
+			if term in terms:
+				offset, count = terms[term]
+				parts.append(postings[offset:offset + count])
+		if not parts:
+			return np.zeros(0, np.int32)
+		return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+	def search(self, query: str, bank: Optional[Bank] = None, limit: Optional[int] = None, **facets: str) -> np.ndarray:
+		"""Bank row ids containing every query term, optionally narrowed by
+		unit/topic/difficulty/subject facets (which need ``bank``)."""
+		if bank is not None and (self.manifest.get("generation") != bank.generation or self.manifest["docs"] > len(bank)):
+			raise ValueError(f"search index {self.path} is stale for this bank; run update first")
+		terms = sorted(set(tokenize(query)))
+		lists = sorted((self.postings(t) for t in terms), key=len)
+		if not lists:
+			return np.zeros(0, np.int32)
+		hits = np.asarray(lists[0])
+		for other in lists[1:]:
+			if not len(hits):
+				break
+			hits = np.intersect1d(hits, other, assume_unique=True)
+		if facets and bank is not None:
+			hits = hits[bank.mask(**facets)[hits]]
+		return hits[:limit] if limit is not None else hits
+
+	def compact(self) -> None:
+		# Merge all segments into one; doc ids are disjoint across segments
+		if len(self.segments) < 2:
+			return
+		old = self.manifest["segments"]
+		vocab, term_ids, doc_ids = {}, [], []
+		for terms, postings in self.segments:
+			for term, (offset, count) in terms.items():
+				tid = vocab.setdefault(term, len(vocab))
+				term_ids.append(np.full(count, tid, np.int32))
+				doc_ids.append(np.asarray(postings[offset:offset + count]))
+		self.manifest["segments"], self.segments = [], []
+		self.write_segment(np.concatenate(term_ids), np.concatenate(doc_ids), list(vocab))
+		self.save_manifest()
+		for name in old:
+			for ext in (".terms.json", ".postings.npy"):
+				os.remove(os.path.join(self.path, name + ext))
+
+
+if __name__ == "__main__":
+	# usage: python search_index.py update <index_dir> <bank_dir>
+	#        python search_index.py query <index_dir> <bank_dir> "<text>" [unit=...] [topic=...] [difficulty=...]
+	command, index_dir, bank_dir = sys.argv[1:4]
+	index = SearchIndex(index_dir)
+	bank = Bank(bank_dir)
+	if command == "update":
+		print(f"indexed {index.update_from_bank(bank)} new question(s)")
+	elif command == "query":
+		facets = dict(arg.split("=", 1) for arg in sys.argv[5:])
+		start = time.perf_counter()
+		hits = index.search(sys.argv[4], bank, **facets)
+		elapsed = (time.perf_counter() - start) * 1000
+		for i in hits[:20]:
+			rec = bank.record(int(i))
+			print(f"{i:>8} @Order {rec['order']:>3} {rec['topic']}: {rec['q']}")
+		print(f"{len(hits)} hit(s) in {elapsed:.1f} ms")
+	else:
+		raise SystemExit(f"unknown command {command!r}")
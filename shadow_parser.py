@@ -0,0 +1,113 @@
+import hashlib
+from copy import deepcopy
+from typing import List, Optional
+
+from docx import Document
+from docx.oxml.ns import qn
+from lxml import etree
+
+from artifacts import png_bytes
+from vector_figures import VectorFigure
+
+WPG_GROUP = "{http://schemas.microsoft.com/office/word/2010/wordprocessingGroup}wgp"
+WPS_CNVPR = "{http://schemas.microsoft.com/office/word/2010/wordprocessingShape}cNvPr"
+
+# Tag -> bank key for single-line fields
+LINE_TAGS = {
+	"@title": "title",
+	"@description": "desc",
+	"@instruction": "instr",
+	"@difficulty": "difficulty",
+	"@subject": "subject",
+	"@unit": "unit",
+	"@topic": "topic",
+}
+
+
+def figure_hash(blob: bytes) -> str:
+	return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def group_hash(group: etree._Element) -> str:
+	# Shape ids and names depend on where the figure sits in the document, so
+	# they are dropped to give the same figure the same hash everywhere
+	group = deepcopy(group)
+	for nv_pr in group.iter(WPS_CNVPR):
+		nv_pr.attrib.pop("id", None)
+		nv_pr.attrib.pop("name", None)
+	return figure_hash(etree.tostring(group, method="c14n"))
+
+
+def split_tag(text: str):
+	tag, _, value = text.partition(" ")
+	return tag, value.strip()
+
+
+def parse_docx(path: str, media: Optional[dict] = None) -> List[dict]:
+	"""Parse an @-tag shadow set back into bank records.
+
+	Both layouts are accepted: Set A (one @title/@description header for the
+	whole set) and the user set (a @title/@description pair before every
+	question). Pictures following a question are recorded as ``figure``, a
+	short SHA-256 of the image bytes; when ``media`` is given it is filled with
+	``hash -> (blob, content_type)`` for every picture seen, vector figures
+	included as rasterized PNGs.
+	"""
+	doc = Document(path)
+	records = []
+	pending = {}
+	titles = 0
+	current = None
+	in_explanation = False
+	for p in doc.paragraphs:
+		for blip in p._p.iter(qn("a:blip")):
+			part = doc.part.related_parts[blip.get(qn("r:embed"))]
+			digest = figure_hash(part.blob)
+			if media is not None:
+				media.setdefault(digest, (part.blob, part.content_type))
+			if current is not None:
+				current["figure"] = digest
+		for group in p._p.iter(WPG_GROUP):
+			# Vector figures have no media part; hash their markup instead and
+			# hand out a rasterized PNG as their media
+			digest = group_hash(group)
+			if media is not None and digest not in media:
+				media[digest] = (png_bytes(VectorFigure.from_group(group).rasterize()), "image/png")
+			if current is not None:
+				current["figure"] = digest
+		text = p.text.strip()
+		if not text or text == "---":
+			continue
+		if not text.startswith("@"):
+			if in_explanation and current is not None:
+				current["exp"] = (current["exp"] + "\n" + text).strip()
+			continue
+		tag, value = split_tag(text)
+		in_explanation = False
+		if tag == "@question":
+			current = dict(pending, q=value, opts=[])
+			pending = {}
+			records.append(current)
+		elif tag in ("@title", "@description") or current is None:
+			titles += tag == "@title"
+			if tag in LINE_TAGS:
+				pending[LINE_TAGS[tag]] = value
+		elif tag in LINE_TAGS:
+			current[LINE_TAGS[tag]] = value
+		elif tag == "@Order":
+			current["order"] = int(value)
+		elif tag in ("@option", "@@option"):
+			current["opts"].append(value)
+			if tag == "@@option":
+				current["ans"] = value
+		elif tag == "@explanation":
+			current["exp"] = value
+			in_explanation = True
+		elif tag == "@plusmarks":
+			current["marks"] = int(value)
+	if titles <= 1:
+		# A single @title is the set header, not part of the first question
+		for rec in records[:1]:
+			rec.pop("title", None)
+			rec.pop("desc", None)
+	return records
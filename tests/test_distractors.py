@@ -0,0 +1,24 @@
+from fractions import Fraction
+
+import pytest
+
+from distractors import generate_distractors, numeric
+
+
+@pytest.mark.parametrize("a, b", [((1, 4), (1, 4)), ((1, 3), (1, 6)), ((5, 12), (7, 18)), ((2, 5), (3, 10))])
+def test_fraction_sum_options_never_equal_the_answer(a, b):
+	answer, wrong = generate_distractors({"kind": "fraction_sum", "a": a, "b": b, "positive": True})
+	values = [numeric(w) for w in wrong]
+	assert Fraction(answer) not in values
+	assert len(set(values)) == len(values)
+
+
+def test_fraction_sum_keeps_unreduced_text():
+	answer, wrong = generate_distractors({"kind": "fraction_sum", "a": (5, 12), "b": (7, 18)})
+	assert answer == "29/36"
+	assert "12/30" in wrong
+
+
+def test_expression_with_unary_minus_and_undefined_model():
+	assert generate_distractors({"kind": "expression", "expr": "−3 + 5"})[0] == "2"
+	assert generate_distractors({"kind": "expression", "expr": "10 ÷ 5 − 5"})[0] == "−3"
@@ -0,0 +1,46 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import exporters
+from exporters import export
+
+
+def item(order, image=None):
+	rec = {"q": f"Question {order}?", "instr": "Pick one.", "difficulty": "easy", "order": order,
+		"opts": ["1", "2", "3"], "ans": "2", "exp": "Because.", "subject": "Math", "unit": "Geometry", "topic": "Lines"}
+	if image:
+		rec["image"] = image
+	return rec
+
+
+def test_vector_twin_figures_are_rasterized_into_media(tmp_path):
+	# build_doc never writes PNGs for vector twins, so the path does not exist
+	missing = str(tmp_path / "images" / "midpoints.png")
+	count = export([item(1, missing), item(2, missing), item(3)], str(tmp_path / "out"), "bank", "T")
+	assert count == 3
+	media = os.listdir(tmp_path / "out" / "media")
+	assert len(media) == 1 and media[0].endswith(".png")
+	rows = [json.loads(line) for line in open(tmp_path / "out" / "bank.jsonl", encoding="utf-8")]
+	assert rows[0]["figure"] == rows[1]["figure"] == f"media/{media[0]}"
+	assert "figure" not in rows[2]
+	quiz = ET.parse(tmp_path / "out" / "bank.xml").getroot()
+	files = list(quiz.iter("file"))
+	assert len(files) == 2 and all(f.get("name") == media[0] and f.text for f in files)
+
+
+def test_moodle_embed_cache_is_bounded(tmp_path, monkeypatch):
+	monkeypatch.setattr(exporters, "EMBED_CACHE_SIZE", 2)
+	images = []
+	for i in range(5):
+		path = tmp_path / f"fig{i}.png"
+		path.write_bytes(b"\x89PNG fake %d" % i)
+		images.append(str(path))
+	out = tmp_path / "out"
+	media = exporters.MediaStore(str(out))
+	with open(out / "q.xml", "w", encoding="utf-8") as f:
+		writer = exporters.MoodleXmlWriter(f, "T", media)
+		for i, path in enumerate(images * 2):
+			writer.write(item(i + 1), media.ref(path))
+		assert len(writer.encoded) == 2
+		writer.close()
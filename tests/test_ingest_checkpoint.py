@@ -0,0 +1,30 @@
+import os
+
+from ingest_archive import Checkpoint
+
+
+def test_torn_done_log_line_is_dropped(tmp_path):
+	cp = Checkpoint(str(tmp_path))
+	cp.commit("a.docx", [{"q": "one"}], None)
+	cp.commit("b.docx", [{"q": "two"}], None)
+	size = os.path.getsize(cp.records_path)
+	# Crash halfway through the next entry: records and a partial log line
+	with open(cp.records_path, "a", encoding="utf-8") as f:
+		f.write('{"q": "thr')
+	with open(cp.done_path, "a", encoding="utf-8") as f:
+		f.write("c.docx\t9")
+	cp = Checkpoint(str(tmp_path))
+	assert cp.done == {"a.docx", "b.docx"}
+	assert os.path.getsize(cp.records_path) == size
+	cp.commit("c.docx", [{"q": "three"}], None)
+	assert Checkpoint(str(tmp_path)).done == {"a.docx", "b.docx", "c.docx"}
+	assert [r["q"] for r in cp.records()] == ["one", "two", "three"]
+
+
+def test_failed_files_are_retried(tmp_path):
+	cp = Checkpoint(str(tmp_path))
+	cp.commit("bad.docx", [], "BadZipFile: File is not a zip file")
+	assert "bad.docx" not in cp.done
+	assert "bad.docx" not in Checkpoint(str(tmp_path)).done
+	with open(os.path.join(str(tmp_path), "errors.log"), encoding="utf-8") as f:
+		assert f.read().startswith("bad.docx\t")
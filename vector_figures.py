@@ -0,0 +1,242 @@
+import os
+from typing import List
+from xml.sax.saxutils import escape
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Emu
+from PIL import Image, ImageDraw
+
+from artifacts import png_bytes
+
+NAMESPACES = (
+	'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+	'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+	'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+	'xmlns:wpg="http://schemas.microsoft.com/office/word/2010/wordprocessingGroup" '
+	'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+)
+GROUP_URI = "http://schemas.microsoft.com/office/word/2010/wordprocessingGroup"
+WPG = "{%s}" % GROUP_URI
+WPS = "{http://schemas.microsoft.com/office/word/2010/wordprocessingShape}"
+EMU_PER_PT = 12700
+# Screen pixels, used when a group read back from a document is rasterized
+EMU_PER_PX = 9525
+# PIL's default bitmap font is about 11 px tall; labels never go below this
+MIN_LABEL_PT = 8
+
+
+def color(value) -> str:
+	if value is None:
+		return "<a:noFill/>"
+	if isinstance(value, tuple):
+		value = "%02X%02X%02X" % value
+	else:
+		value = {"black": "000000", "white": "FFFFFF", "blue": "0000FF"}[value]
+	return f'<a:solidFill><a:srgbClr val="{value}"/></a:solidFill>'
+
+
+class VectorFigure:
+	"""Line art described in the pixel space of the matching raster figure.
+
+	Shapes are collected as DrawingML preset geometries and emitted as one
+	inline shape group, scaled so the figure has the same printed width as the
+	bitmap it replaces. ``rasterize`` draws the same shape list with PIL, so
+	the PNG and the vector figure come from one description.
+	"""
+
+	def __init__(self, w: int, h: int) -> None:
+		self.w = w
+		self.h = h
+		self.shapes: List[tuple] = []
+
+	def line(self, x0, y0, x1, y1, fill="black", width=3) -> None:
+		self.shapes.append(("line", x0, y0, x1, y1, None, fill, width, None))
+
+	def rect(self, x0, y0, x1, y1, outline="black", width=3, fill=None) -> None:
+		self.shapes.append(("rect", x0, y0, x1, y1, fill, outline, width, None))
+
+	def ellipse(self, x0, y0, x1, y1, outline="black", width=3, fill=None) -> None:
+		self.shapes.append(("ellipse", x0, y0, x1, y1, fill, outline, width, None))
+
+	def text(self, x, y, label: str, fill="black") -> None:
+		self.shapes.append(("rect", x, y, x + 8 * len(label) + 6, y + 14, None, None, 0, (label, fill)))
+
+	def shape_xml(self, shape_id: int, shape: tuple, scale: float) -> str:
+		prst, x0, y0, x1, y1, fill, outline, width, label = shape
+		flip = ""
+		if prst == "line":
+			flip = (' flipH="1"' if x1 < x0 else "") + (' flipV="1"' if y1 < y0 else "")
+		x, y = round(min(x0, x1) * scale), round(min(y0, y1) * scale)
+		cx, cy = round(abs(x1 - x0) * scale), round(abs(y1 - y0) * scale)
+		ln = "<a:ln><a:noFill/></a:ln>" if outline is None else f'<a:ln w="{round(width * scale)}">{color(outline)}</a:ln>'
+		xml = (
+			f'<wps:wsp><wps:cNvPr id="{shape_id}" name="Shape {shape_id}"/>'
+			+ ("<wps:cNvCnPr/>" if prst == "line" else "<wps:cNvSpPr/>")
+			+ f'<wps:spPr><a:xfrm{flip}><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+			+ f'<a:prstGeom prst="{prst}"><a:avLst/></a:prstGeom>{color(fill)}{ln}</wps:spPr>'
+		)
+		if label is not None:
+			text, text_fill = label
+			size = max(MIN_LABEL_PT, round(11 * scale / EMU_PER_PT)) * 2
+			hex_fill = color(text_fill).split('val="')[1][:6]
+			xml += (
+				'<wps:txbx><w:txbxContent><w:p><w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr><w:r><w:rPr>'
+				f'<w:color w:val="{hex_fill}"/><w:sz w:val="{size}"/></w:rPr>'
+				f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:txbxContent></wps:txbx>'
+				'<wps:bodyPr wrap="none" lIns="0" tIns="0" rIns="0" bIns="0"><a:spAutoFit/></wps:bodyPr>'
+			)
+		else:
+			xml += "<wps:bodyPr/>"
+		return xml + "</wps:wsp>"
+
+	@classmethod
+	def from_group(cls, group) -> "VectorFigure":
+		"""Read a ``wpg:wgp`` group written by ``add_to`` back into a figure in
+		screen pixels, so figures found in a document can be rasterized."""
+		def px(value) -> int:
+			return round(int(value) / EMU_PER_PX)
+
+		def rgb(parent):
+			clr = None if parent is None else parent.find(f"{qn('a:solidFill')}/{qn('a:srgbClr')}")
+			return None if clr is None else tuple(bytes.fromhex(clr.get("val")))
+
+		ext = group.find(f"{WPG}grpSpPr/{qn('a:xfrm')}/{qn('a:ext')}")
+		f = cls(px(ext.get("cx")), px(ext.get("cy")))
+		for wsp in group.iter(WPS + "wsp"):
+			sp_pr = wsp.find(WPS + "spPr")
+			xfrm = sp_pr.find(qn("a:xfrm"))
+			off, size = xfrm.find(qn("a:off")), xfrm.find(qn("a:ext"))
+			x0, y0 = px(off.get("x")), px(off.get("y"))
+			x1, y1 = x0 + px(size.get("cx")), y0 + px(size.get("cy"))
+			prst = sp_pr.find(qn("a:prstGeom")).get("prst")
+			if xfrm.get("flipH") == "1":
+				x0, x1 = x1, x0
+			if xfrm.get("flipV") == "1":
+				y0, y1 = y1, y0
+			ln = sp_pr.find(qn("a:ln"))
+			width = max(1, px(ln.get("w", "0"))) if ln is not None and ln.get("w") else 0
+			texts = [t.text or "" for t in wsp.iter(qn("w:t"))]
+			if texts:
+				color = wsp.find(f".//{qn('w:color')}")
+				fill = tuple(bytes.fromhex(color.get(qn("w:val")))) if color is not None else (0, 0, 0)
+				f.shapes.append(("rect", x0, y0, x1, y1, None, None, 0, ("".join(texts), fill)))
+			else:
+				f.shapes.append((prst, x0, y0, x1, y1, rgb(sp_pr), rgb(ln), width, None))
+		return f
+
+	def rasterize(self) -> Image.Image:
+		img = Image.new("RGB", (self.w, self.h), "white")
+		d = ImageDraw.Draw(img)
+		for prst, x0, y0, x1, y1, fill, outline, width, label in self.shapes:
+			if label is not None:
+				d.text((x0, y0), label[0], fill=label[1])
+			elif prst == "line":
+				d.line((x0, y0, x1, y1), fill=outline, width=width)
+			elif prst == "rect":
+				d.rectangle((x0, y0, x1, y1), fill=fill, outline=outline, width=width)
+			else:
+				d.ellipse((x0, y0, x1, y1), fill=fill, outline=outline, width=width)
+		return img
+
+	def add_to(self, doc: Document, width: Emu) -> None:
+		scale = int(width) / self.w
+		cx, cy = int(width), round(self.h * scale)
+		first_id = doc.part.next_id
+		shapes = "".join(self.shape_xml(first_id + 1 + k, s, scale) for k, s in enumerate(self.shapes))
+		xml = (
+			f"<w:r {NAMESPACES}><w:drawing>"
+			'<wp:inline distT="0" distB="0" distL="0" distR="0">'
+			f'<wp:extent cx="{cx}" cy="{cy}"/><wp:effectExtent l="0" t="0" r="0" b="0"/>'
+			f'<wp:docPr id="{first_id}" name="Figure {first_id}"/><wp:cNvGraphicFramePr/>'
+			f'<a:graphic><a:graphicData uri="{GROUP_URI}"><wpg:wgp><wpg:cNvGrpSpPr/>'
+			f'<wpg:grpSpPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/>'
+			f'<a:chOff x="0" y="0"/><a:chExt cx="{cx}" cy="{cy}"/></a:xfrm></wpg:grpSpPr>'
+			f"{shapes}</wpg:wgp></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>"
+		)
+		doc.add_paragraph()._p.append(parse_xml(xml))
+
+
+# ---------- Vector twins of the simple raster figures ----------
+
+def vec_circle_in_square() -> VectorFigure:
+	w, h = 280, 280
+	f = VectorFigure(w, h)
+	f.rect(20, 20, w - 20, h - 20)
+	f.ellipse(20, 20, w - 20, h - 20)
+	return f
+
+
+def vec_labelled_points(w: int, h: int, margin: int, step: int, last: int) -> VectorFigure:
+	f = VectorFigure(w, h)
+	y = h // 2
+	points = [("R", margin), ("S", margin + step), ("T", margin + 2 * step), ("V", margin + last)]
+	f.line(margin, y, margin + last, y)
+	for label, x in points:
+		f.ellipse(x - 4, y - 4, x + 4, y + 4, outline=None, fill="black")
+		f.text(x - 6, y - 24, label)
+	return f
+
+
+def vec_midpoints() -> VectorFigure:
+	return vec_labelled_points(660, 120, 30, 120, 480)
+
+
+def vec_midpoints_generic() -> VectorFigure:
+	margin, step = 40, 140
+	f = vec_labelled_points(660, 140, margin, step, 560)
+	s, t = margin + step, margin + 2 * step
+	f.text((s + t) // 2 - 14, f.h // 2 + 10, "ST=12")
+	return f
+
+
+def vec_card_holes() -> VectorFigure:
+	w, h = 280, 280
+	f = VectorFigure(w, h)
+	f.rect(20, 20, w - 20, h - 20)
+	f.ellipse(80, 90, 100, 110)
+	f.ellipse(180, 160, 200, 180)
+	return f
+
+
+def vec_segments_two_squares() -> VectorFigure:
+	w, h = 720, 200
+	f = VectorFigure(w, h)
+	y = h // 2
+	x = 40
+	for i, (L, label) in enumerate(zip([180, 240, 300], ["AB=6 cm", "CD=8 cm", "EF=10 cm"])):
+		f.line(x, y, x + L, y, width=4)
+		f.text(x + L // 2 - 30, y + 10, label)
+		if i < 2:
+			s = 60
+			f.rect(x + L - s // 2, y - s - 10, x + L - s // 2 + s, y - 10)
+		x += L
+	return f
+
+
+# Raster file name -> vector twin; figures not listed keep the PNG path
+VECTOR_FIGURES = {
+	"circle_in_square.png": vec_circle_in_square,
+	"midpoints.png": vec_midpoints,
+	"midpoints_user.png": vec_midpoints_generic,
+	"card_holes_user.png": vec_card_holes,
+	"segments_squares.png": vec_segments_two_squares,
+}
+
+
+def figure_bytes(image_path: str) -> bytes:
+	# PNG for a question's figure; vector twins are not written to disk by
+	# build_doc, so they are rasterized from their description when missing
+	if not os.path.exists(image_path) and os.path.basename(image_path) in VECTOR_FIGURES:
+		return png_bytes(VECTOR_FIGURES[os.path.basename(image_path)]().rasterize())
+	with open(image_path, "rb") as f:
+		return f.read()
+
+
+def add_figure(doc: Document, image_path: str, width: Emu, vector: bool = True) -> None:
+	builder = VECTOR_FIGURES.get(os.path.basename(image_path)) if vector else None
+	if builder is None:
+		doc.add_picture(image_path, width=width)
+	else:
+		builder().add_to(doc, width)